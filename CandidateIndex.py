@@ -0,0 +1,178 @@
+import json
+import os
+import threading
+import numpy as np
+import pandas as pd
+import Ranker
+from Ranker import (
+    WEIGHTS, embed_candidate_fields, get_embedding_cache, get_embeddings,
+    job_description_chunks, normalize_rows, preprocess_candidates,
+)
+
+class CandidateIndex:
+    """
+    Persistent flat vector index of every gathered candidate, across all candidate CSV files.
+
+    ranker_sort scores a candidate as sum_f(weight_f * cos(field_f, jd)). With
+    normalized vectors that is (sum_f weight_f * field_f) . jd, so each candidate
+    is stored as that single weighted vector, and a query is one matrix-vector
+    product over the whole pool followed by a partial sort for the top k. The
+    scores are the same `total_score` ranker_sort computes with "mean" pooling
+    of the job description chunks, as max pooling is not linear.
+
+    Vectors are appended to a flat float32 file read through a memory map, and
+    candidate rows are appended to a JSON lines file, in the same order. A
+    small metadata file records the model and the vector dimension. Vectors
+    are written before their rows, so an interrupted insert only leaves
+    vectors or a partial row past the indexed rows, which are ignored.
+
+    :param index_dir: Directory holding the index files
+    """
+
+    def __init__(self, index_dir=".candidate_index"):
+        self.index_dir = index_dir
+        self.vectors_path = os.path.join(index_dir, "vectors.float32")
+        self.rows_path = os.path.join(index_dir, "rows.jsonl")
+        self.meta_path = os.path.join(index_dir, "meta.json")
+        self._lock = threading.Lock()
+        self._vectors = None
+
+        self.meta = None
+        if os.path.exists(self.meta_path):
+            with open(self.meta_path, "r", encoding="utf-8") as f:
+                self.meta = json.load(f)
+
+        # Size in bytes of the complete rows, past which an interrupted insert may have left a partial line
+        self.rows = []
+        self._rows_size = 0
+        # Without metadata the vectors cannot be read back, the next insert rebuilds the index
+        if self.meta is not None and os.path.exists(self.rows_path):
+            with open(self.rows_path, "rb") as f:
+                for line in f:
+                    try:
+                        row = json.loads(line)
+                    except json.JSONDecodeError:
+                        break
+                    if not line.endswith(b"\n"):
+                        break
+                    self.rows.append(row)
+                    self._rows_size += len(line)
+        self.urn_ids = {row["urn id"] for row in self.rows}
+
+    def __len__(self):
+        return len(self.rows)
+
+    @staticmethod
+    def model_name():
+        """Name of the model and backend the ranker currently embeds with."""
+        return f"{Ranker.MODEL_NAME}@{Ranker.ENCODER_BACKEND}"
+
+    def _check_model(self):
+        if self.meta and self.meta["model"] != self.model_name():
+            raise ValueError(f"Candidate index {self.index_dir} was built with {self.meta['model']}, "
+                             f"not {self.model_name()}; rebuild it from the candidate CSV files")
+
+    def _load_vectors(self):
+        """Memory map of the indexed candidate vectors, or None if the index is empty."""
+        if self._vectors is None and self.rows:
+            # Vectors left past the indexed rows by an interrupted insert are outside the map
+            self._vectors = np.memmap(self.vectors_path, dtype=np.float32, mode="r",
+                                      shape=(len(self.rows), self.meta["dim"]))
+        return self._vectors
+
+    def add_csv(self, candidate_csv_file, batch_size=64):
+        """
+        Insert the candidates of a CSV file that are not in the index yet.
+
+        :return: Number of candidates inserted
+        """
+        self._check_model()
+        candidates_df = pd.read_csv(candidate_csv_file)
+        candidates_df = candidates_df[~candidates_df["urn id"].isin(self.urn_ids)]
+        candidates_df = candidates_df.drop_duplicates(subset="urn id")
+        if candidates_df.empty:
+            return 0
+
+        # Keep the rows as gathered, the copy is preprocessed for embedding
+        rows = json.loads(candidates_df.to_json(orient="records"))
+        preprocess_candidates(candidates_df)
+        _, scored_fields, field_embeddings = embed_candidate_fields(
+            candidates_df, batch_size=batch_size, cache=get_embedding_cache()
+        )
+        weight_vector = np.array([WEIGHTS[field] for field in scored_fields], dtype=np.float32)
+        vectors = np.tensordot(weight_vector, field_embeddings, axes=1).astype(np.float32)
+
+        with self._lock:
+            os.makedirs(self.index_dir, exist_ok=True)
+            if self.meta is None:
+                self.meta = {"model": self.model_name(), "dim": int(vectors.shape[1])}
+                with open(self.meta_path + ".tmp", "w", encoding="utf-8") as f:
+                    json.dump(self.meta, f)
+                os.replace(self.meta_path + ".tmp", self.meta_path)
+
+            # Drop what an interrupted insert may have left past the indexed rows
+            mode = "r+b" if os.path.exists(self.vectors_path) else "wb"
+            with open(self.vectors_path, mode) as f:
+                f.truncate(len(self.rows) * self.meta["dim"] * 4)
+                f.seek(0, os.SEEK_END)
+                f.write(vectors.tobytes())
+            mode = "r+b" if os.path.exists(self.rows_path) else "wb"
+            with open(self.rows_path, mode) as f:
+                f.truncate(self._rows_size)
+                f.seek(0, os.SEEK_END)
+                for row in rows:
+                    row["source"] = candidate_csv_file
+                    line = (json.dumps(row) + "\n").encode("utf-8")
+                    f.write(line)
+                    self._rows_size += len(line)
+
+            self.rows.extend(rows)
+            self.urn_ids.update(row["urn id"] for row in rows)
+            self._vectors = None
+
+        return len(rows)
+
+    def query(self, job_description, k=10, jd_sections=None):
+        """
+        Return the k best candidates of the whole pool for a job description.
+
+        :return: DataFrame of the candidate rows with their `total_score`, best first
+        """
+        self._check_model()
+        chunk_embeddings = normalize_rows(get_embeddings(job_description_chunks(job_description, jd_sections)))
+        (job_desc_embedding,) = normalize_rows(chunk_embeddings.mean(axis=0, keepdims=True))
+        with self._lock:
+            vectors = self._load_vectors()
+            if vectors is None:
+                return pd.DataFrame(columns=["total_score"])
+            scores = np.asarray(vectors) @ job_desc_embedding
+
+            k = min(k, len(scores))
+            top = np.argpartition(-scores, k - 1)[:k]
+            top = top[np.argsort(-scores[top])]
+            results = pd.DataFrame([self.rows[i] for i in top])
+        results["total_score"] = scores[top]
+        return results
+
+    def query_file(self, job_description_file, k=10, jd_sections=None):
+        """Same as query(), for a job description file."""
+        with open(job_description_file, "r", encoding="utf-8") as f:
+            return self.query(f.read(), k=k, jd_sections=jd_sections)
+
+# Process-wide index, created by get_candidate_index()
+_candidate_index = None
+_candidate_index_lock = threading.Lock()
+
+def get_candidate_index():
+    """Return the process-wide candidate index."""
+    global _candidate_index
+    with _candidate_index_lock:
+        if _candidate_index is None:
+            _candidate_index = CandidateIndex()
+    return _candidate_index
+
+# Example usage
+if __name__ == "__main__":
+    index = get_candidate_index()
+    index.add_csv("candidates.csv")
+    print(index.query_file("Google_Software Engineer.md", k=10))
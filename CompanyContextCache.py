@@ -0,0 +1,81 @@
+import json
+import sqlite3
+import threading
+import time
+
+class CompanyContextCache:
+    """
+    Persistent cache of the LinkedIn context of companies, backed by SQLite.
+
+    Entries hold the resolved company URN, the company details and the most
+    recent posts, keyed by company name, and expire after `ttl` seconds.
+
+    :param path: Path of the SQLite database
+    :param ttl: Time to live of an entry in seconds
+    :param max_posts: Number of recent posts kept per company
+    """
+
+    def __init__(self, path=".company_context.sqlite", ttl=24 * 60 * 60, max_posts=3):
+        self.path = path
+        self.ttl = ttl
+        self.max_posts = max_posts
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute(
+            """
+            CREATE TABLE IF NOT EXISTS companies (
+                company TEXT PRIMARY KEY,
+                urn_id TEXT NOT NULL,
+                details TEXT NOT NULL,
+                posts TEXT NOT NULL,
+                expires_at REAL NOT NULL
+            )
+            """
+        )
+        self._db.commit()
+
+    @staticmethod
+    def key(company):
+        """Cache key of a company identifier, ignoring case and surrounding spaces."""
+        return company.strip().lower()
+
+    def get(self, company):
+        """Return the cached context of a company, or None if missing or expired."""
+        with self._lock:
+            row = self._db.execute(
+                "SELECT urn_id, details, posts, expires_at FROM companies WHERE company = ?",
+                (self.key(company),),
+            ).fetchone()
+        if row is None or row[3] <= time.time():
+            return None
+        urn_id, details, posts, _ = row
+        return {"company_urn": urn_id, "company_details": json.loads(details), "company_posts": json.loads(posts)}
+
+    def set(self, company, urn_id, details, posts):
+        """Store the context of a company, keeping only its most recent posts."""
+        posts = list(posts or [])[:self.max_posts]
+        with self._lock:
+            self._db.execute(
+                "REPLACE INTO companies VALUES (?, ?, ?, ?, ?)",
+                (self.key(company), urn_id, json.dumps(details), json.dumps(posts), time.time() + self.ttl),
+            )
+            self._db.commit()
+        return {"company_urn": urn_id, "company_details": details, "company_posts": posts}
+
+    def invalidate(self, company):
+        """Remove the cached context of a company."""
+        with self._lock:
+            self._db.execute("DELETE FROM companies WHERE company = ?", (self.key(company),))
+            self._db.commit()
+
+# Process-wide cache, created by get_company_context_cache()
+_company_context_cache = None
+_company_context_cache_lock = threading.Lock()
+
+def get_company_context_cache():
+    """Return the process-wide company context cache, opening its database on first use."""
+    global _company_context_cache
+    with _company_context_cache_lock:
+        if _company_context_cache is None:
+            _company_context_cache = CompanyContextCache()
+    return _company_context_cache
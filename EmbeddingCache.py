@@ -0,0 +1,141 @@
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+import numpy as np
+
+class EmbeddingCache:
+    """
+    Persistent, content-addressed store of text embeddings.
+
+    Vectors live in a flat binary file that is read through a memory map, with a
+    small JSON index mapping hash(model name + text) to a row. Once the vectors
+    take more than `max_size` bytes, the least recently used ones are evicted.
+
+    :param model_name: Name of the model the embeddings come from
+    :param cache_dir: Directory holding one sub-directory per model
+    :param dtype: "float32", or "float16" to halve the disk footprint
+    :param max_size: Maximum size of the vector file in bytes
+    """
+
+    def __init__(self, model_name, cache_dir=".embedding_cache", dtype="float32",
+                 max_size=256 * 1024 * 1024):
+        self.model_name = model_name
+        self.dtype = np.dtype(dtype)
+        self.max_size = max_size
+        self.directory = os.path.join(cache_dir, re.sub(r"[^A-Za-z0-9_.-]", "_", model_name))
+        self.index_path = os.path.join(self.directory, f"index.{self.dtype.name}.json")
+        self.vectors_path = os.path.join(self.directory, f"vectors.{self.dtype.name}")
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+        # rows: key -> [row number, last access time]
+        self.dim = None
+        self.rows = {}
+        if os.path.exists(self.index_path):
+            with open(self.index_path, "r", encoding="utf-8") as f:
+                index = json.load(f)
+            self.dim = index["dim"]
+            self.rows = index["rows"]
+
+    def key(self, text):
+        """Content address of a (preprocessed) text for this model."""
+        return hashlib.sha256(f"{self.model_name}\n{text}".encode("utf-8")).hexdigest()
+
+    def _vectors(self):
+        """Memory map of the stored vectors, or None if there are none yet."""
+        if not self.rows or not os.path.exists(self.vectors_path):
+            return None
+        num_rows = max(row for row, _ in self.rows.values()) + 1
+        return np.memmap(self.vectors_path, dtype=self.dtype, mode="r",
+                         shape=(num_rows, self.dim))
+
+    def get_many(self, texts):
+        """Return {text: embedding} for the texts that are in the cache."""
+        found = {}
+        with self._lock:
+            vectors = self._vectors()
+            now = time.time()
+            for text in texts:
+                entry = self.rows.get(self.key(text))
+                if entry is None or vectors is None:
+                    self.misses += 1
+                    continue
+                entry[1] = now
+                found[text] = np.array(vectors[entry[0]], dtype=np.float32)
+                self.hits += 1
+        return found
+
+    def put_many(self, texts, embeddings):
+        """Store the embeddings of the given texts and save the index."""
+        embeddings = np.asarray(embeddings, dtype=self.dtype)
+        if len(texts) == 0:
+            return
+
+        with self._lock:
+            if self.dim is None:
+                self.dim = embeddings.shape[1]
+            os.makedirs(self.directory, exist_ok=True)
+
+            num_rows = max((row for row, _ in self.rows.values()), default=-1) + 1
+            new_keys = {}
+            for text, embedding in zip(texts, embeddings):
+                key = self.key(text)
+                if key not in self.rows:
+                    new_keys[key] = embedding
+
+            # Rows past the indexed ones were left by an interrupted write, overwrite them
+            mode = "r+b" if os.path.exists(self.vectors_path) else "wb"
+            with open(self.vectors_path, mode) as f:
+                f.truncate(num_rows * self.dim * self.dtype.itemsize)
+                f.seek(0, os.SEEK_END)
+                if new_keys:
+                    f.write(np.stack(list(new_keys.values())).tobytes())
+
+            now = time.time()
+            for i, key in enumerate(new_keys):
+                self.rows[key] = [num_rows + i, now]
+
+            self._evict()
+            self._save_index()
+
+    def save(self):
+        """Persist the access times of cache hits, used for eviction."""
+        with self._lock:
+            if self.rows:
+                self._save_index()
+
+    def _evict(self):
+        """Keep only the most recently used vectors that fit in `max_size`, compacting the file."""
+        row_size = self.dim * self.dtype.itemsize
+        max_rows = self.max_size // row_size
+        if len(self.rows) <= max_rows:
+            return
+
+        kept = sorted(self.rows.items(), key=lambda item: item[1][1], reverse=True)[:max_rows]
+        vectors = self._vectors()
+        compacted = np.zeros((len(kept), self.dim), dtype=self.dtype)
+        for i, (_, (row, _)) in enumerate(kept):
+            compacted[i] = vectors[row]
+        del vectors
+
+        tmp_path = self.vectors_path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(compacted.tobytes())
+        os.replace(tmp_path, self.vectors_path)
+        self.rows = {key: [i, last_used] for i, (key, (_, last_used)) in enumerate(kept)}
+
+    def _save_index(self):
+        tmp_path = self.index_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"model": self.model_name, "dtype": self.dtype.name,
+                       "dim": self.dim, "rows": self.rows}, f)
+        os.replace(tmp_path, self.index_path)
+
+    @property
+    def stats(self):
+        """Hit and miss counters and the number of stored vectors."""
+        return {"hits": self.hits, "misses": self.misses, "entries": len(self.rows)}
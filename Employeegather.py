@@ -1,114 +1,269 @@
 import csv
-from linkedin_api import Linkedin
-from requests.cookies import cookiejar_from_dict
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from LinkedinProvider import get_linkedin
 from requests.exceptions import TooManyRedirects, RequestException
 
-def gather_people_csv(keyWord, limit, api):
+CSV_HEADERS = [
+    "urn id", "skills", "job title", "experience", "location",
+    "Certifications", "Education", "Past Job Titles",
+    "link to profile", "name", "profile image URL"
+]
+
+def fetch_profile(api, urn_id):
+    """
+    Fetch the full profile of a search hit, an empty dict if it has no URN,
+    or None if the request fails (e.g. rate limited or expired cookies).
+    """
+    if not urn_id:
+        return {}
+    try:
+        return api.get_profile(urn_id=urn_id)
+    except Exception as e:
+        print(f"Error fetching profile for {urn_id}: {e}")
+        return None
+
+def build_row(person, profile):
+    """Build the CSV row of a candidate from its search hit and full profile."""
+    urn_id = person.get("urn_id", "")
+    name = person.get("name", "N/A")
+    job_title = person.get("jobtitle", "N/A")
+    location = person.get("location", "N/A")
+    profile_link = f"https://www.linkedin.com/in/{person.get('public_id', urn_id)}" if urn_id else "N/A"
+
+    # Extract skills
+    skills = "; ".join([skill.get("name", "") for skill in profile.get("skills", [])]) if profile.get("skills") else "N/A"
+
+    # Extract experience details
+    experience = []
+    past_job_titles = []
+    for exp in profile.get("experience", []):
+        title = exp.get("title", "N/A")
+        company = exp.get("companyName", "N/A")
+        duration = exp.get("timePeriod", {}).get("duration", "N/A")
+        experience.append(f"{title} at {company} ({duration})")
+        past_job_titles.append(title)
+    experience_str = "; ".join(experience) if experience else "N/A"
+    past_job_titles_str = "; ".join(past_job_titles) if past_job_titles else "N/A"
+
+    # Extract certifications
+    certifications = "; ".join([cert.get("name", "") for cert in profile.get("certifications", [])]) if profile.get("certifications") else "N/A"
+
+    # Extract education
+    education = []
+    for edu in profile.get("education", []):
+        school = edu.get("schoolName", "N/A")
+        degree = edu.get("degreeName", "N/A")
+        field = edu.get("fieldOfStudy", "N/A")
+        education.append(f"{degree} in {field} from {school}")
+    education_str = "; ".join(education) if education else "N/A"
+
+    # Extract profile image URL
+    image_url = "N/A"
+    if "displayPictureUrl" in profile:
+        image_keys = [key for key in profile if key.startswith("img_")]
+        if image_keys:
+            largest_key = max(image_keys, key=lambda k: int(k.split("_")[1]))
+            image_url = profile["displayPictureUrl"] + profile[largest_key]
+
+    return [
+        urn_id,
+        skills,
+        job_title,
+        experience_str,
+        location,
+        certifications,
+        education_str,
+        past_job_titles_str,
+        profile_link,
+        name,
+        image_url  # New image field
+    ]
+
+def sort_csv_rows(csv_file, order):
+    """Rewrite the rows of a CSV file so that row i of the file moves to position order[i]."""
+    with open(csv_file, mode='r', newline='', encoding='utf-8') as file:
+        reader = csv.reader(file)
+        headers = next(reader)
+        rows = list(reader)
+
+    ordered_rows = [row for _, row in sorted(zip(order, rows), key=lambda pair: pair[0])]
+
+    # Write to a temporary file first so that a crash never leaves a half written CSV
+    with open(csv_file + ".tmp", mode='w', newline='', encoding='utf-8') as file:
+        writer = csv.writer(file)
+        writer.writerow(headers)
+        writer.writerows(ordered_rows)
+    os.replace(csv_file + ".tmp", csv_file)
+
+def sanitize_filename(text):
+    """Replace spaces and special characters with underscores."""
+    return text.replace(" ", "_").replace("/", "_").replace("\\", "_").lower()
+
+def candidates_csv_path(keyWord):
+    """Return the path of the candidate CSV file for a keyword, e.g. a role such as "UI/UX Designer"."""
+    return f"candidates_{sanitize_filename(keyWord)}.csv"
+
+def journal_path(csv_file):
+    """Return the path of the checkpoint journal of a candidate CSV file."""
+    return f"{csv_file}.journal"
+
+def read_journal(csv_file):
+    """
+    Read the checkpoint journal of a candidate CSV file.
+
+    The journal has one JSON line per row written to the CSV, in the same order,
+    and a final {"complete": true} line once gathering has finished.
+
+    :return: Journal entries and whether gathering completed
+    :rtype: tuple(list, bool)
+    """
+    entries = []
+    complete = False
+    if not os.path.exists(journal_path(csv_file)):
+        return entries, complete
+
+    with open(journal_path(csv_file), mode='r', encoding='utf-8') as journal:
+        for line in journal:
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError:
+                # Partially written last line of a crashed run
+                break
+            if entry.get("complete"):
+                complete = True
+            else:
+                entries.append(entry)
+    return entries, complete
+
+def is_gather_complete(csv_file):
+    """Return True if the candidate CSV file exists and was completely gathered."""
+    return os.path.exists(csv_file) and read_journal(csv_file)[1]
+
+def truncate_csv_rows(csv_file, num_rows):
+    """Keep only the header and the first num_rows rows of a CSV file."""
+    with open(csv_file, mode='r', newline='', encoding='utf-8') as file:
+        reader = csv.reader(file)
+        headers = next(reader, CSV_HEADERS)
+        rows = list(reader)[:num_rows]
+
+    # Write to a temporary file first so that a crash never loses the rows already gathered
+    with open(csv_file + ".tmp", mode='w', newline='', encoding='utf-8') as file:
+        writer = csv.writer(file)
+        writer.writerow(headers)
+        writer.writerows(rows)
+    os.replace(csv_file + ".tmp", csv_file)
+
+def gather_people_csv(keyWord, limit, api=None, max_workers=1):
     """
     Gather candidate details from LinkedIn based on a keyword and save to a CSV file.
 
+    Profiles are fetched by a pool of `max_workers` threads while the search is
+    still paging. Rows are written as soon as their profile arrives, and sorted
+    back into search order once every profile has been fetched. Give `api` a
+    shared rate limiter to keep the request rate bounded when `max_workers > 1`.
+
+    Every written row is recorded in a checkpoint journal next to the CSV file.
+    If a previous run was interrupted, candidates already in the journal are
+    skipped and only the missing ones are fetched and appended. Candidates
+    whose profile could not be fetched are neither written nor journaled, and
+    gathering is left incomplete so that the next run fetches them again.
+
     :param keyWord: Keyword to search for (e.g., "fullstack developer")
     :type keyWord: str
     :param limit: Maximum number of people to search for
     :type limit: int
+    :param api: Authenticated LinkedIn client, defaults to the shared one of LinkedinProvider
+    :type api: Linkedin
+    :param max_workers: Number of profile fetches in flight
+    :type max_workers: int
     :return: Path to the generated CSV file
     :rtype: str
+    :raises Exception: If some profiles could not be fetched, once the others are saved
     """
-    # Step 1: Search for people using the keyword
-    people = api.search_people(keywords=keyWord, limit=limit)
+    api = api or get_linkedin()
 
     # CSV file setup
-    csv_file = f"candidates_{keyWord.replace(' ', '_')}.csv"
-    headers = [
-        "urn id", "skills", "job title", "experience", "location",
-        "Certifications", "Education", "Past Job Titles",
-        "link to profile", "name", "profile image URL"
-    ]
+    csv_file = candidates_csv_path(keyWord)
+
+    entries, complete = read_journal(csv_file)
+    resume = os.path.exists(csv_file) and bool(entries)
+    if complete and os.path.exists(csv_file):
+        return csv_file
+
+    if resume:
+        # Drop rows written after the last journal entry of the interrupted run
+        truncate_csv_rows(csv_file, len(entries))
+        print(f"Resuming {csv_file}: {len(entries)} candidates already gathered")
+    else:
+        entries = []
+
+    done = {entry["key"] for entry in entries}
+
+    # Step 1: Search for people using the keyword, page by page
+    people = api.iter_search_people(keywords=keyWord, limit=limit)
 
-    # Open CSV file for writing
-    with open(csv_file, mode='w', newline='', encoding='utf-8') as file:
+    # Open CSV file and journal, appending to them when resuming
+    mode = 'a' if resume else 'w'
+    with open(csv_file, mode=mode, newline='', encoding='utf-8') as file, \
+            open(journal_path(csv_file), mode=mode, encoding='utf-8') as journal:
         writer = csv.writer(file)
-        writer.writerow(headers)
+        if not resume:
+            writer.writerow(CSV_HEADERS)
+
+        failed = []
 
-        # Step 2: Gather detailed profile data for each person
-        for person in people:
-            urn_id = person.get("urn_id", "")
-            name = person.get("name", "N/A")
-            job_title = person.get("jobtitle", "N/A")
-            location = person.get("location", "N/A")
-            profile_link = f"https://www.linkedin.com/in/{person.get('public_id', urn_id)}" if urn_id else "N/A"
+        def write_row(future, index, key, person):
+            profile = future.result()
+            if profile is None:
+                failed.append(key)
+                return
+            writer.writerow(build_row(person, profile))
+            file.flush()
+            # Journal the row only once it is safely in the CSV file
+            journal.write(json.dumps({"key": key, "index": index}) + "\n")
+            journal.flush()
+            entries.append({"key": key, "index": index})
 
-            # Fetch full profile details using get_profile
+        # Step 2: Gather detailed profile data for each missing person, concurrently
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            pending = {}
             try:
-                profile = api.get_profile(urn_id=urn_id) if urn_id else {}
-            except Exception as e:
-                print(f"Error fetching profile for {urn_id}: {e}")
-                profile = {}
-
-            # Extract skills
-            skills = "; ".join([skill.get("name", "") for skill in profile.get("skills", [])]) if profile.get("skills") else "N/A"
-
-            # Extract experience details
-            experience = []
-            past_job_titles = []
-            for exp in profile.get("experience", []):
-                title = exp.get("title", "N/A")
-                company = exp.get("companyName", "N/A")
-                duration = exp.get("timePeriod", {}).get("duration", "N/A")
-                experience.append(f"{title} at {company} ({duration})")
-                past_job_titles.append(title)
-            experience_str = "; ".join(experience) if experience else "N/A"
-            past_job_titles_str = "; ".join(past_job_titles) if past_job_titles else "N/A"
-
-            # Extract certifications
-            certifications = "; ".join([cert.get("name", "") for cert in profile.get("certifications", [])]) if profile.get("certifications") else "N/A"
-
-            # Extract education
-            education = []
-            for edu in profile.get("education", []):
-                school = edu.get("schoolName", "N/A")
-                degree = edu.get("degreeName", "N/A")
-                field = edu.get("fieldOfStudy", "N/A")
-                education.append(f"{degree} in {field} from {school}")
-            education_str = "; ".join(education) if education else "N/A"
-
-            # Extract profile image URL
-            image_url = "N/A"
-            if "displayPictureUrl" in profile:
-                image_keys = [key for key in profile if key.startswith("img_")]
-                if image_keys:
-                    largest_key = max(image_keys, key=lambda k: int(k.split("_")[1]))
-                    image_url = profile["displayPictureUrl"] + profile[largest_key]
-
-            # Write row to CSV
-            writer.writerow([
-                urn_id,
-                skills,
-                job_title,
-                experience_str,
-                location,
-                certifications,
-                education_str,
-                past_job_titles_str,
-                profile_link,
-                name,
-                image_url  # New image field
-            ])
+                for index, person in enumerate(people):
+                    key = person.get("urn_id") or f"#{index}"
+                    if key in done:
+                        continue
+                    future = executor.submit(fetch_profile, api, person.get("urn_id", ""))
+                    pending[future] = (index, key, person)
+
+                    # Write the profiles that already arrived while the search keeps paging
+                    for finished in [f for f in pending if f.done()]:
+                        write_row(finished, *pending.pop(finished))
+            finally:
+                # Also runs if the search fails, so fetched profiles are not lost
+                for finished in as_completed(pending):
+                    write_row(finished, *pending[finished])
+
+    # Step 3: Restore the original search order, then mark the journal complete unless profiles are missing
+    sort_csv_rows(csv_file, [entry["index"] for entry in entries])
+    with open(journal_path(csv_file) + ".tmp", mode='w', encoding='utf-8') as journal:
+        for entry in sorted(entries, key=lambda entry: entry["index"]):
+            journal.write(json.dumps(entry) + "\n")
+        if not failed:
+            journal.write(json.dumps({"complete": True}) + "\n")
+    os.replace(journal_path(csv_file) + ".tmp", journal_path(csv_file))
+    if failed:
+        raise Exception(f"{len(failed)} profiles could not be fetched, gather again to fetch them")
 
     return csv_file
 
 # Example usage
 if __name__ == "__main__":
-    # Initialize LinkedIn API connection
-    EMAIL = ""
-    PASSWORD = ""
-
-    api = Linkedin(username=EMAIL, password=PASSWORD, cookies=cookiejar_from_dict({
-    'li_at': '',
-    'JSESSIONID': ""
-    }))
+    # Shared LinkedIn connection, from the LI_AT_VALUE and JSESSIONID cookies in .env
+    api = get_linkedin()
 
     keyword = "fullstack developer"
     limit = 3  # Limiting to 5 for testing; increase as needed
-    csv_file_path = gather_people_csv(keyword, limit, api)
+    csv_file_path = gather_people_csv(keyword, limit, api, max_workers=4)
     print(f"CSV file generated: {csv_file_path}")
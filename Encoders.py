@@ -0,0 +1,96 @@
+import numpy as np
+
+class SentenceTransformerEncoder:
+    """
+    Sentence-BERT model run by PyTorch through sentence-transformers.
+
+    :param model_name: Name of the sentence-transformers model
+    :param num_threads: Threads PyTorch runs on, None for its default of one per core
+    """
+
+    def __init__(self, model_name, num_threads=None):
+        # Imported here as importing sentence_transformers alone takes seconds
+        from sentence_transformers import SentenceTransformer
+        if num_threads:
+            import torch
+            torch.set_num_threads(num_threads)
+        self.model_name = model_name
+        self.model = SentenceTransformer(model_name)
+
+    def encode(self, texts, batch_size=32):
+        return self.model.encode(texts, batch_size=batch_size)
+
+class OnnxEncoder:
+    """
+    Sentence-BERT model run by ONNX Runtime on the CPU, int8-quantized by default.
+
+    Uses the ONNX exports published with the sentence-transformers models on the
+    Hugging Face Hub, with the same mean pooling and normalization as the
+    PyTorch model, so `encode` is a drop-in replacement.
+
+    :param model_name: Name of the sentence-transformers model
+    :param model_file: ONNX file of the model repository to run
+    :param max_length: Inputs are truncated to this many tokens, like the PyTorch model
+    :param num_threads: Threads a model run uses, None for ONNX Runtime's default of one per core
+    """
+
+    def __init__(self, model_name, model_file="onnx/model_quint8_avx2.onnx", max_length=256, num_threads=None):
+        # Imported here as the ONNX backend is optional
+        import onnxruntime
+        from huggingface_hub import hf_hub_download
+        from tokenizers import Tokenizer
+
+        repo_id = model_name if "/" in model_name else f"sentence-transformers/{model_name}"
+        self.model_name = model_name
+
+        self.tokenizer = Tokenizer.from_file(hf_hub_download(repo_id, "tokenizer.json"))
+        self.tokenizer.enable_truncation(max_length=max_length)
+        self.tokenizer.enable_padding()
+
+        options = onnxruntime.SessionOptions()
+        options.graph_optimization_level = onnxruntime.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if num_threads:
+            options.intra_op_num_threads = num_threads
+        self.session = onnxruntime.InferenceSession(
+            hf_hub_download(repo_id, model_file), options, providers=["CPUExecutionProvider"]
+        )
+        self.input_names = {model_input.name for model_input in self.session.get_inputs()}
+
+    def encode(self, texts, batch_size=32):
+        single = isinstance(texts, str)
+        if single:
+            texts = [texts]
+
+        embeddings = []
+        for start in range(0, len(texts), batch_size):
+            encodings = self.tokenizer.encode_batch(texts[start:start + batch_size])
+            inputs = {
+                "input_ids": np.array([e.ids for e in encodings], dtype=np.int64),
+                "attention_mask": np.array([e.attention_mask for e in encodings], dtype=np.int64),
+                "token_type_ids": np.array([e.type_ids for e in encodings], dtype=np.int64),
+            }
+            inputs = {name: value for name, value in inputs.items() if name in self.input_names}
+            token_embeddings = self.session.run(None, inputs)[0]
+
+            # Mean pooling over the real tokens, then normalization, as in the PyTorch model
+            mask = inputs["attention_mask"][..., None].astype(np.float32)
+            pooled = (token_embeddings * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+            pooled /= np.clip(np.linalg.norm(pooled, axis=1, keepdims=True), 1e-12, None)
+            embeddings.append(pooled.astype(np.float32))
+
+        if not embeddings:
+            return np.zeros((0, 0), dtype=np.float32)
+        embeddings = np.concatenate(embeddings)
+        return embeddings[0] if single else embeddings
+
+# Encoder backends by name
+ENCODER_BACKENDS = {
+    "torch": SentenceTransformerEncoder,
+    "onnx": OnnxEncoder,
+}
+
+def load_encoder(model_name, backend="torch", num_threads=None):
+    """Load a model with the given backend, "torch" or "onnx", running on `num_threads` threads."""
+    if backend not in ENCODER_BACKENDS:
+        raise ValueError(f"Unknown encoder backend {backend!r}, expected one of {list(ENCODER_BACKENDS)}")
+    return ENCODER_BACKENDS[backend](model_name, num_threads=num_threads)
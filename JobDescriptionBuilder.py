@@ -6,10 +6,9 @@ from langgraph.graph import StateGraph, START, END
 from langgraph.graph.message import add_messages
 from langchain_community.tools.tavily_search import TavilySearchResults
 from dotenv import load_dotenv
-from requests.utils import cookiejar_from_dict
-from linkedin_api import Linkedin
-import time
-import random
+from LinkedinProvider import get_linkedin
+from CompanyContextCache import get_company_context_cache
+from LLMCache import get_llm_cache
 
 # Load environment variables
 load_dotenv()
@@ -18,27 +17,30 @@ TAVILY_API_KEY = os.getenv("TAVILY_API_KEY")
 
 # LinkedIn API setup function
 def get_linkedin_data(company_name):
-    li_at_value = os.getenv("LI_AT_VALUE")
-    JSESSIONID = os.getenv("JSESSIONID")
-    cookie_dict = {"li_at": li_at_value, "JSESSIONID": JSESSIONID}
-    cookie_jar = cookiejar_from_dict(cookie_dict)
-    api = Linkedin(username="", password="", cookies=cookie_jar)
+    """
+    Return the LinkedIn URN, details and recent posts of a company, from the
+    company context cache when fresh, so regenerating a JD or generating one
+    for another role at the same company makes no LinkedIn request.
+    """
+    # Company data barely changes within a day, so it is fetched from LinkedIn once a day per company
+    company_context_cache = get_company_context_cache()
+    context = company_context_cache.get(company_name)
+    if context is not None:
+        return context
+
+    # Shared client: requests are paced by its rate limiter
+    api = get_linkedin()
 
-    time.sleep(random.uniform(1, 3))
     search_results = api.search_companies(company_name)
     if not search_results:
         raise Exception(f'Company "{company_name}" not found.')
     company_urn = search_results[0]['urn_id']
     if not company_urn:
         raise Exception(f'URN ID for company "{company_name}" not found.')
-    time.sleep(random.uniform(1, 3))
     company_details = api.get_company(company_urn)
-    time.sleep(random.uniform(1, 3))
-    company_posts = api.get_company_updates(company_urn)
-    return {
-        'company_details': company_details,
-        'company_posts': company_posts
-    }
+    # Only the latest posts are used, so the update history is not downloaded
+    company_posts = api.get_company_recent_posts(urn_id=company_urn, limit=company_context_cache.max_posts)
+    return company_context_cache.set(company_name, company_urn, company_details, company_posts)
 
 # Define state for the graph
 class State(TypedDict):
@@ -72,15 +74,12 @@ def input_node(state: State):
     if not firm or not role:
         raise ValueError("Firm name and role must be provided.")
     
-    # Fetch LinkedIn data
+    # Fetch LinkedIn data, or read it from the company context cache. Only the company keys are returned, as the search
+    # node runs in the same step and writes the other keys
     linkedin_data = get_linkedin_data(firm)
     return {
-        "firm_name": firm,
-        "role": role,
         "company_details": linkedin_data["company_details"],
-        "company_posts": linkedin_data["company_posts"],
-        "search_results": [],
-        "job_description": ""
+        "company_posts": linkedin_data["company_posts"]
     }
 
 graph_builder.add_node("input", input_node)
@@ -91,7 +90,7 @@ tavily_search = TavilySearchResults(max_results=2, api_key=TAVILY_API_KEY)
 def search_node(state: State):
     """
     Performs a web search to gather role responsibilities.
-    Uses LinkedIn data for company info directly from state.
+    Runs concurrently with the input node, as it needs no LinkedIn data.
     """
     role = state["role"]
     role_info = tavily_search.invoke(f"Responsibilities of a {role}")
@@ -141,7 +140,7 @@ def job_description_node(state: State):
     post_text = "No recent posts available"
     if company_posts:
         try:
-            post_text = company_posts[0]['value']['com.linkedin.voyager.feed.render.UpdateV2']['commentary']['text']['text']
+            post_text = company_posts[0]['text'] or post_text
         except KeyError:
             pass
 
@@ -167,17 +166,19 @@ def job_description_node(state: State):
     - Benefits
     """
 
-    job_desc = llm.invoke(prompt)
+    # Unchanged inputs give the same prompt, answered from the cache without a model call
+    job_desc = get_llm_cache().invoke(llm, prompt)
     return {
-        "job_description": job_desc.content
+        "job_description": job_desc
     }
 
 graph_builder.add_node("generate_job_description", job_description_node)
 
-# Define edges
+# Define edges: the LinkedIn lookup and the role search fan out from the start
+# and run concurrently, generation waits for both
 graph_builder.add_edge(START, "input")
-graph_builder.add_edge("input", "search")
-graph_builder.add_edge("search", "generate_job_description")
+graph_builder.add_edge(START, "search")
+graph_builder.add_edge(["input", "search"], "generate_job_description")
 graph_builder.add_edge("generate_job_description", END)
 
 # Compile the graph
@@ -193,6 +194,32 @@ def run_graph(firm_name: str, role: str) -> None:
     with open(f"{firm_name}_{role}.md", "w") as file:
         file.write(result["job_description"])
     return fileName
+
+def stream_graph(firm_name: str, role: str, file_name: str = ""):
+    """
+    Executes the job description generation workflow like run_graph, yielding the
+    job description text as the LLM generates it. The markdown file is written
+    once generation has finished.
+    """
+    file_name = file_name or f"{firm_name}_{role}.md"
+    streamed = False
+    job_description = ""
+    for mode, chunk in graph.stream({"firm_name": firm_name, "role": role}, stream_mode=["messages", "values"]):
+        if mode == "messages":
+            # LLM tokens, from the generation node only
+            message, metadata = chunk
+            if metadata.get("langgraph_node") == "generate_job_description" and message.content:
+                streamed = True
+                yield message.content
+        else:
+            job_description = chunk.get("job_description", job_description)
+
+    # A cached response produces no tokens, so it comes out whole
+    if not streamed:
+        yield job_description
+
+    with open(file_name, "w", encoding="utf-8") as file:
+        file.write(job_description)
     
     
 if __name__ == "__main__":
@@ -0,0 +1,220 @@
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+import time
+import numpy as np
+
+class LLMCache:
+    """
+    Persistent cache of LLM responses, backed by SQLite.
+
+    Prompts are looked up by the hash of the model name and the prompt with its
+    whitespace normalized. With `similarity_threshold` and an `embed` function
+    (texts -> matrix), a prompt without an exact match is also answered from
+    the most similar cached prompt of the same model, if their cosine
+    similarity is at least the threshold. Entries expire after `ttl` seconds.
+
+    :param path: Path of the SQLite database
+    :param ttl: Time to live of a response in seconds
+    :param similarity_threshold: Minimum similarity of a near-duplicate prompt, None to disable
+    :param embed: Function embedding a list of prompts, required for near-duplicate lookups
+    """
+
+    def __init__(self, path=".llm_cache.sqlite", ttl=7 * 24 * 60 * 60, similarity_threshold=None, embed=None):
+        self.path = path
+        self.ttl = ttl
+        self.similarity_threshold = similarity_threshold
+        self.embed = embed
+        self.hits = 0
+        self.misses = 0
+        self.saved_tokens = 0
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute(
+            """
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                model TEXT NOT NULL,
+                response TEXT NOT NULL,
+                tokens INTEGER NOT NULL,
+                embedding BLOB,
+                expires_at REAL NOT NULL
+            )
+            """
+        )
+        self._db.commit()
+
+    @staticmethod
+    def normalize(prompt):
+        """Prompt with its whitespace collapsed, as indentation and blank lines do not change the answer."""
+        return re.sub(r"\s+", " ", prompt).strip()
+
+    @staticmethod
+    def key(model, prompt):
+        """Cache key of a (normalized) prompt to a model."""
+        return hashlib.sha256(f"{model}\n{prompt}".encode("utf-8")).hexdigest()
+
+    def _exact(self, model, prompt):
+        """Cached (response, tokens) of a normalized prompt, or None."""
+        return self._db.execute(
+            "SELECT response, tokens FROM responses WHERE key = ? AND expires_at > ?",
+            (self.key(model, prompt), time.time()),
+        ).fetchone()
+
+    def _near_duplicate(self, model, embedding):
+        """Most similar cached response of a model, if similar enough."""
+        rows = self._db.execute(
+            "SELECT response, tokens, embedding FROM responses "
+            "WHERE model = ? AND embedding IS NOT NULL AND expires_at > ?",
+            (model, time.time()),
+        ).fetchall()
+        rows = [row for row in rows if len(row[2]) == embedding.nbytes]
+        if not rows:
+            return None
+        similarities = np.stack([np.frombuffer(row[2], dtype=np.float32) for row in rows]) @ embedding
+        best = int(np.argmax(similarities))
+        if similarities[best] < self.similarity_threshold:
+            return None
+        return rows[best][:2]
+
+    def _embeddings(self, prompts):
+        """Normalized embeddings of prompts from one embed call, or Nones without near-duplicate lookups."""
+        if self.similarity_threshold is None or self.embed is None or not prompts:
+            return [None] * len(prompts)
+        embeddings = np.asarray(self.embed(prompts), dtype=np.float32)
+        embeddings /= np.clip(np.linalg.norm(embeddings, axis=1, keepdims=True), 1e-12, None)
+        return list(embeddings)
+
+    def _count(self, row):
+        if row is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+            self.saved_tokens += row[1]
+
+    def _lookup_many(self, model, prompts):
+        """
+        Look prompts up by exact match first, then embed only the prompts
+        without one, in a single call, for near-duplicate lookups.
+
+        :return: Cached responses by prompt index, and (index, prompt, embedding) of the prompts still missing
+        """
+        prompts = [self.normalize(prompt) for prompt in prompts]
+        found, missing = {}, []
+        with self._lock:
+            for i, prompt in enumerate(prompts):
+                row = self._exact(model, prompt)
+                if row is None:
+                    missing.append(i)
+                else:
+                    found[i] = row
+                    self._count(row)
+
+        embeddings = self._embeddings([prompts[i] for i in missing])
+        still_missing = []
+        with self._lock:
+            for i, embedding in zip(missing, embeddings):
+                row = None if embedding is None else self._near_duplicate(model, embedding)
+                self._count(row)
+                if row is None:
+                    still_missing.append((i, prompts[i], embedding))
+                else:
+                    found[i] = row
+        return {i: row[0] for i, row in found.items()}, still_missing
+
+    def get(self, model, prompt, embedding=None):
+        """Return the cached response to a prompt, or None."""
+        prompt = self.normalize(prompt)
+        with self._lock:
+            row = self._exact(model, prompt)
+            if row is None and embedding is not None:
+                row = self._near_duplicate(model, embedding)
+            self._count(row)
+        return row[0] if row else None
+
+    def set(self, model, prompt, response, tokens=0, embedding=None):
+        """Store the response to a prompt and the tokens it cost."""
+        prompt = self.normalize(prompt)
+        with self._lock:
+            self._db.execute("DELETE FROM responses WHERE expires_at <= ?", (time.time(),))
+            self._db.execute(
+                "REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?)",
+                (self.key(model, prompt), model, response, tokens,
+                 None if embedding is None else embedding.tobytes(), time.time() + self.ttl),
+            )
+            self._db.commit()
+
+    def invoke(self, llm, prompt):
+        """
+        Return the text of the LangChain chat model's response to a prompt,
+        calling the model only if no cached response matches. The prompt is
+        embedded only if it has no exact match.
+        """
+        model = getattr(llm, "model", type(llm).__name__)
+        found, missing = self._lookup_many(model, [prompt])
+        if found:
+            return found[0]
+
+        _, prompt, embedding = missing[0]
+        message = llm.invoke(prompt)
+        tokens = (getattr(message, "usage_metadata", None) or {}).get("total_tokens", 0)
+        self.set(model, prompt, message.content, tokens, embedding)
+        return message.content
+
+    def batch_as_completed(self, llm, prompts, max_concurrency=8):
+        """
+        Yield (index, response text) for many prompts, cached ones first, then
+        the others as the model answers them, with at most `max_concurrency`
+        model calls in flight. Prompts without an exact match are embedded
+        together in one call. A failed call yields its exception as the response.
+        """
+        model = getattr(llm, "model", type(llm).__name__)
+        found, missing = self._lookup_many(model, prompts)
+        yield from found.items()
+        if not missing:
+            return
+
+        results = llm.batch_as_completed(
+            [prompt for _, prompt, _ in missing],
+            config={"max_concurrency": max_concurrency},
+            return_exceptions=True,
+        )
+        for j, message in results:
+            i, prompt, embedding = missing[j]
+            if isinstance(message, Exception):
+                yield i, message
+                continue
+            tokens = (getattr(message, "usage_metadata", None) or {}).get("total_tokens", 0)
+            self.set(model, prompt, message.content, tokens, embedding)
+            yield i, message.content
+
+    @property
+    def stats(self):
+        """Hit and miss counters, tokens saved by hits and the number of cached responses."""
+        with self._lock:
+            (entries,) = self._db.execute("SELECT COUNT(*) FROM responses").fetchone()
+        return {"hits": self.hits, "misses": self.misses, "saved_tokens": self.saved_tokens, "entries": entries}
+
+# Process-wide cache, created by get_llm_cache()
+_llm_cache = None
+_llm_cache_lock = threading.Lock()
+
+def get_llm_cache():
+    """
+    Return the process-wide LLM response cache. Near-duplicate lookups, with the
+    ranker's embedding model, are enabled by setting LLM_CACHE_SIMILARITY to a
+    similarity threshold such as 0.98.
+    """
+    global _llm_cache
+    with _llm_cache_lock:
+        if _llm_cache is None:
+            threshold = os.getenv("LLM_CACHE_SIMILARITY")
+            if threshold:
+                # Imported here as only near-duplicate lookups need the embedding model
+                from Ranker import get_embeddings
+                _llm_cache = LLMCache(similarity_threshold=float(threshold), embed=get_embeddings)
+            else:
+                _llm_cache = LLMCache()
+    return _llm_cache
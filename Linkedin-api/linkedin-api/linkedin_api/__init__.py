@@ -3,5 +3,8 @@
 """
 
 from .linkedin import Linkedin
+from .rate_limiter import RateLimiter
+from .async_linkedin import AsyncLinkedin
+from .response_cache import ResponseCache
 
-__all__ = ["Linkedin"]
+__all__ = ["Linkedin", "AsyncLinkedin", "RateLimiter", "ResponseCache"]
@@ -0,0 +1,209 @@
+"""
+Provides an asyncio interface to the Linkedin API
+"""
+
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+
+from requests.adapters import HTTPAdapter
+
+from linkedin_api.linkedin import Linkedin
+from linkedin_api.rate_limiter import RateLimiter
+
+
+class AsyncLinkedin(object):
+    """
+    Class for accessing the LinkedIn API from asyncio code.
+
+    Requests are sent by a `Linkedin` instance, so authentication, cookies and
+    the CSRF token are handled exactly as in the synchronous client. Calls run
+    on a pool of at most `max_concurrency` worker threads which share one pooled
+    HTTP session, and every request goes through a shared `RateLimiter`. The
+    session's HTTPS adapter is replaced by one keeping `max_concurrency`
+    connections alive.
+
+    :param username: Username of LinkedIn account.
+    :type username: str
+    :param password: Password of LinkedIn account.
+    :type password: str
+    :param max_concurrency: Maximum number of requests in flight, defaults to 8
+    :type max_concurrency: int, optional
+    :param rate_limiter: Rate limiter for this account. A default one is created if not given.
+    :type rate_limiter: RateLimiter, optional
+    """
+
+    def __init__(
+        self,
+        username: str,
+        password: str,
+        *,
+        max_concurrency: int = 8,
+        rate_limiter: Optional[RateLimiter] = None,
+        **kwargs,
+    ):
+        """Constructor method"""
+        rate_limiter = rate_limiter or RateLimiter()
+        api = Linkedin(username, password, rate_limiter=rate_limiter, **kwargs)
+        self._attach(api, max_concurrency)
+
+    @classmethod
+    def from_client(cls, api: Linkedin, *, max_concurrency: int = 8) -> "AsyncLinkedin":
+        """Wrap an already authenticated `Linkedin` instance.
+
+        The client must have a rate limiter, which paces the requests of both
+        clients. Its session is shared: the HTTPS adapter mounted on it keeps
+        `max_concurrency` connections alive, for every user of the session.
+
+        :param api: Authenticated Linkedin client, with a rate limiter
+        :type api: Linkedin
+        :param max_concurrency: Maximum number of requests in flight, defaults to 8
+        :type max_concurrency: int, optional
+
+        :raises ValueError: If `api` has no rate limiter
+
+        :return: Async client sharing the session and rate limiter of `api`
+        :rtype: AsyncLinkedin
+        """
+        if not api.rate_limiter:
+            raise ValueError(
+                "api must have a rate limiter, e.g. Linkedin(..., rate_limiter=RateLimiter())"
+            )
+
+        async_api = cls.__new__(cls)
+        async_api._attach(api, max_concurrency)
+        return async_api
+
+    def _attach(self, api: Linkedin, max_concurrency: int):
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be at least 1")
+
+        self.api = api
+        self.rate_limiter = api.rate_limiter
+        self.max_concurrency = max_concurrency
+
+        # one connection per worker, so concurrent requests reuse keep-alive connections
+        adapter = HTTPAdapter(
+            pool_connections=max_concurrency, pool_maxsize=max_concurrency
+        )
+        self.api.client.session.mount("https://", adapter)
+
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_concurrency, thread_name_prefix="linkedin-api"
+        )
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.aclose()
+
+    async def aclose(self):
+        """Release the worker threads. Pending calls are completed first."""
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, self._executor.shutdown)
+
+    async def _run(self, method, *args, **kwargs):
+        """Run a blocking `Linkedin` method on the worker pool."""
+        # created lazily so that it is bound to the running event loop
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        loop = asyncio.get_running_loop()
+        async with self._semaphore:
+            return await loop.run_in_executor(
+                self._executor, functools.partial(method, *args, **kwargs)
+            )
+
+    async def get_profile(
+        self, public_id: Optional[str] = None, urn_id: Optional[str] = None
+    ) -> Dict:
+        """Fetch data for a given LinkedIn profile. See `Linkedin.get_profile`.
+
+        :param public_id: LinkedIn public ID for a profile
+        :type public_id: str, optional
+        :param urn_id: LinkedIn URN ID for a profile
+        :type urn_id: str, optional
+
+        :return: Profile data
+        :rtype: dict
+        """
+        return await self._run(self.api.get_profile, public_id=public_id, urn_id=urn_id)
+
+    async def get_profile_skills(
+        self, public_id: Optional[str] = None, urn_id: Optional[str] = None
+    ) -> List:
+        """Fetch the skills listed on a given LinkedIn profile. See `Linkedin.get_profile_skills`.
+
+        :param public_id: LinkedIn public ID for a profile
+        :type public_id: str, optional
+        :param urn_id: LinkedIn URN ID for a profile
+        :type urn_id: str, optional
+
+        :return: List of skill objects
+        :rtype: list
+        """
+        return await self._run(
+            self.api.get_profile_skills, public_id=public_id, urn_id=urn_id
+        )
+
+    async def get_profile_experiences(self, urn_id: str) -> List:
+        """Fetch experiences for a given LinkedIn profile. See `Linkedin.get_profile_experiences`.
+
+        :param urn_id: LinkedIn URN ID for a profile
+        :type urn_id: str
+
+        :return: List of experiences
+        :rtype: list
+        """
+        return await self._run(self.api.get_profile_experiences, urn_id)
+
+    async def search_people(self, *args, **kwargs) -> List[Dict]:
+        """Perform a LinkedIn search for people. Accepts the same parameters as `Linkedin.search_people`.
+
+        :return: List of profiles (minimal data only)
+        :rtype: list
+        """
+        return await self._run(self.api.search_people, *args, **kwargs)
+
+    async def get_company(self, public_id) -> Dict:
+        """Fetch data about a given LinkedIn company. See `Linkedin.get_company`.
+
+        :param public_id: LinkedIn public ID for a company
+        :type public_id: str
+
+        :return: Company data
+        :rtype: dict
+        """
+        return await self._run(self.api.get_company, public_id)
+
+    async def send_message(
+        self,
+        message_body: str,
+        conversation_urn_id: Optional[str] = None,
+        recipients: Optional[List[str]] = None,
+        origin_token: Optional[str] = None,
+    ):
+        """Send a message to a given conversation. See `Linkedin.send_message`.
+
+        :param message_body: Message text to send
+        :type message_body: str
+        :param conversation_urn_id: LinkedIn URN ID for a conversation
+        :type conversation_urn_id: str, optional
+        :param recipients: List of profile urn id's
+        :type recipients: list, optional
+        :param origin_token: Client generated token identifying the message, for deduplicated retries
+        :type origin_token: str, optional
+
+        :return: Error state. If True, an error occured.
+        :rtype: boolean
+        """
+        return await self._run(
+            self.api.send_message,
+            message_body,
+            conversation_urn_id=conversation_urn_id,
+            recipients=recipients,
+            origin_token=origin_token,
+        )
@@ -10,9 +10,11 @@ import re
 from operator import itemgetter
 from time import sleep
 from urllib.parse import urlencode, quote
-from typing import Dict, Union, Optional, List, Literal
+from typing import Dict, Iterator, Union, Optional, List, Literal
 
 from linkedin_api.client import Client
+from linkedin_api.rate_limiter import RateLimiter
+from linkedin_api.response_cache import ResponseCache
 from linkedin_api.utils.helpers import (
     get_id_from_urn,
     get_urn_from_raw_update,
@@ -34,6 +36,13 @@ def default_evade():
     sleep(random.randint(2, 5))  # sleep a random duration to try and evade suspention
 
 
+def _remaining(max_results: Optional[int], results: List) -> Optional[int]:
+    """Number of results still wanted, given those already collected"""
+    if max_results is None:
+        return None
+    return max(0, max_results - len(results))
+
+
 class Linkedin(object):
     """
     Class for accessing the LinkedIn API.
@@ -42,6 +51,13 @@ class Linkedin(object):
     :type username: str
     :param password: Password of LinkedIn account.
     :type password: str
+    :param rate_limiter: Rate limiter shared by every client of this account. When
+        given, requests only wait when its budget is exhausted, instead of the
+        random delay of `default_evade`.
+    :type rate_limiter: RateLimiter, optional
+    :param response_cache: On-disk cache for read-only endpoints. Cached responses
+        are served without a network request.
+    :type response_cache: ResponseCache, optional
     """
 
     _MAX_POST_COUNT = 100  # max seems to be 100 posts per page
@@ -62,6 +78,8 @@ class Linkedin(object):
         proxies={},
         cookies=None,
         cookies_dir: str = "",
+        rate_limiter: Optional[RateLimiter] = None,
+        response_cache: Optional[ResponseCache] = None,
     ):
         """Constructor method"""
         self.client = Client(
@@ -72,6 +90,8 @@ class Linkedin(object):
         )
         logging.basicConfig(level=logging.DEBUG if debug else logging.INFO)
         self.logger = logger
+        self.rate_limiter = rate_limiter
+        self.response_cache = response_cache
 
         if authenticate:
             if cookies:
@@ -81,12 +101,38 @@ class Linkedin(object):
             else:
                 self.client.authenticate(username, password)
 
-    def _fetch(self, uri: str, evade=default_evade, base_request=False, **kwargs):
-        """GET request to Linkedin API"""
-        evade()
+    def _evade(self, kind: str):
+        """Wait before a request, using the rate limiter if there is one"""
+        if self.rate_limiter:
+            self.rate_limiter.acquire(kind)
+        else:
+            default_evade()
 
+    def _fetch(self, uri: str, evade=None, base_request=False, **kwargs):
+        """GET request to Linkedin API"""
         url = f"{self.client.API_BASE_URL if not base_request else self.client.LINKEDIN_BASE_URL}{uri}"
-        return self.client.session.get(url, **kwargs)
+
+        ttl = None
+        if self.response_cache and not base_request:
+            ttl = self.response_cache.ttl_for(uri)
+        if ttl:
+            cache_key = ResponseCache.key(
+                "GET", url, kwargs.get("params"), kwargs.get("headers")
+            )
+            res = self.response_cache.get(cache_key)
+            if res is not None:
+                self.logger.debug(f"response cache hit: {uri}")
+                return res
+
+        if evade:
+            evade()
+        else:
+            self._evade(RateLimiter.READ)
+
+        res = self.client.session.get(url, **kwargs)
+        if ttl:
+            self.response_cache.set(cache_key, res, ttl)
+        return res
 
     def _cookies(self):
         """Return client cookies"""
@@ -96,13 +142,47 @@ class Linkedin(object):
         """Return client cookies"""
         return self.client.REQUEST_HEADERS
 
-    def _post(self, uri: str, evade=default_evade, base_request=False, **kwargs):
+    def _post(self, uri: str, evade=None, base_request=False, **kwargs):
         """POST request to Linkedin API"""
-        evade()
+        if evade:
+            evade()
+        else:
+            self._evade(RateLimiter.WRITE)
 
         url = f"{self.client.API_BASE_URL if not base_request else self.client.LINKEDIN_BASE_URL}{uri}"
         return self.client.session.post(url, **kwargs)
 
+    def _iter_paged_elements(
+        self, uri: str, params: Dict, page_size: int, max_results=None, offset=0
+    ) -> Iterator[Dict]:
+        """Yield the "elements" of a paginated GET endpoint, one page at a time.
+
+        Stops on an empty page, once `max_results` elements have been yielded,
+        or after `_MAX_REPEATED_REQUESTS` pages. Never requests more elements
+        than are still needed.
+        """
+        n_results = 0
+        for _ in range(Linkedin._MAX_REPEATED_REQUESTS):
+            count = page_size
+            if max_results is not None:
+                if n_results >= max_results:
+                    return
+                count = min(page_size, max_results - n_results)
+
+            page_params = dict(params, count=count, start=n_results + offset)
+            res = self._fetch(uri, params=page_params)
+            elements = res.json().get("elements", [])
+            if not elements:
+                return
+
+            for element in elements:
+                if max_results is not None and n_results >= max_results:
+                    return
+                n_results += 1
+                yield element
+
+            self.logger.debug(f"results grew: {n_results}")
+
     def get_profile_posts(
         self,
         public_id: Optional[str] = None,
@@ -222,21 +302,38 @@ class Linkedin(object):
         :return: List of search results
         :rtype: list
         """
+        return list(self.iter_search(params, limit=limit, offset=offset))
+
+    def iter_search(self, params: Dict, limit=-1, offset=0) -> Iterator[Dict]:
+        """Perform a LinkedIn search, yielding results as each page is parsed.
+
+        Same as Linkedin.search(), without waiting for the last page.
+
+        :param params: Search parameters (see code)
+        :type params: dict
+        :param limit: Maximum number of results, defaults to -1 (no limit)
+        :type limit: int, optional
+        :param offset: Index to start searching from
+        :type offset: int, optional
+
+        :return: Generator of search results
+        :rtype: generator
+        """
         count = Linkedin._MAX_SEARCH_COUNT
         if limit is None:
             limit = -1
 
-        results = []
+        n_results = 0
         while True:
             # when we're close to the limit, only fetch what we need to
-            if limit > -1 and limit - len(results) < count:
-                count = limit - len(results)
+            if limit > -1 and limit - n_results < count:
+                count = limit - n_results
             default_params = {
                 "count": str(count),
                 "filters": "List()",
                 "origin": "GLOBAL_SEARCH_HEADER",
                 "q": "all",
-                "start": len(results) + offset,
+                "start": n_results + offset,
                 "queryContext": "List(spellCorrectionEnabled->true,relatedSearchesEnabled->true,kcardTypes->PROFILE|COMPANY)",
                 "includeWebMetadata": "true",
             }
@@ -262,15 +359,15 @@ class Linkedin(object):
             data_clusters = data.get("data", {}).get("searchDashClustersByAll", [])
 
             if not data_clusters:
-                return []
+                return
 
             if (
                 not data_clusters.get("_type", [])
                 == "com.linkedin.restli.common.CollectionResponse"
             ):
-                return []
+                return
 
-            new_elements = []
+            n_new_elements = 0
             for it in data_clusters.get("elements", []):
                 if (
                     not it.get("_type", [])
@@ -293,22 +390,20 @@ class Linkedin(object):
                         == "com.linkedin.voyager.dash.search.EntityResultViewModel"
                     ):
                         continue
-                    new_elements.append(e)
-
-            results.extend(new_elements)
+                    n_new_elements += 1
+                    n_results += 1
+                    yield e
 
             # break the loop if we're done searching
             # NOTE: we could also check for the `total` returned in the response.
             # This is in data["data"]["paging"]["total"]
             if (
-                (-1 < limit <= len(results))  # if our results exceed set limit
-                or len(results) / count >= Linkedin._MAX_REPEATED_REQUESTS
-            ) or len(new_elements) == 0:
+                (-1 < limit <= n_results)  # if our results exceed set limit
+                or n_results / count >= Linkedin._MAX_REPEATED_REQUESTS
+            ) or n_new_elements == 0:
                 break
 
-            self.logger.debug(f"results grew to {len(results)}")
-
-        return results
+            self.logger.debug(f"results grew to {n_results}")
 
     def search_people(
         self,
@@ -384,6 +479,69 @@ class Linkedin(object):
         :return: List of profiles (minimal data only)
         :rtype: list
         """
+        return list(
+            self.iter_search_people(
+                keywords=keywords,
+                connection_of=connection_of,
+                network_depths=network_depths,
+                current_company=current_company,
+                past_companies=past_companies,
+                nonprofit_interests=nonprofit_interests,
+                profile_languages=profile_languages,
+                regions=regions,
+                industries=industries,
+                schools=schools,
+                contact_interests=contact_interests,
+                service_categories=service_categories,
+                include_private_profiles=include_private_profiles,
+                keyword_first_name=keyword_first_name,
+                keyword_last_name=keyword_last_name,
+                keyword_title=keyword_title,
+                keyword_company=keyword_company,
+                keyword_school=keyword_school,
+                network_depth=network_depth,
+                title=title,
+                **kwargs,
+            )
+        )
+
+    def iter_search_people(
+        self,
+        keywords: Optional[str] = None,
+        connection_of: Optional[str] = None,
+        network_depths: Optional[
+            List[Union[Literal["F"], Literal["S"], Literal["O"]]]
+        ] = None,
+        current_company: Optional[List[str]] = None,
+        past_companies: Optional[List[str]] = None,
+        nonprofit_interests: Optional[List[str]] = None,
+        profile_languages: Optional[List[str]] = None,
+        regions: Optional[List[str]] = None,
+        industries: Optional[List[str]] = None,
+        schools: Optional[List[str]] = None,
+        contact_interests: Optional[List[str]] = None,
+        service_categories: Optional[List[str]] = None,
+        include_private_profiles=False,  # profiles without a public id, "Linkedin Member"
+        # Keywords filter
+        keyword_first_name: Optional[str] = None,
+        keyword_last_name: Optional[str] = None,
+        # `keyword_title` and `title` are the same. We kept `title` for backward compatibility. Please only use one of them.
+        keyword_title: Optional[str] = None,
+        keyword_company: Optional[str] = None,
+        keyword_school: Optional[str] = None,
+        network_depth: Optional[
+            Union[Literal["F"], Literal["S"], Literal["O"]]
+        ] = None,  # DEPRECATED - use network_depths
+        title: Optional[str] = None,  # DEPRECATED - use keyword_title
+        **kwargs,
+    ) -> Iterator[Dict]:
+        """Perform a LinkedIn search for people, yielding profiles as each page is parsed.
+
+        Takes the same parameters as Linkedin.search_people().
+
+        :return: Generator of profiles (minimal data only)
+        :rtype: generator
+        """
         filters = ["(key:resultType,value:List(PEOPLE))"]
         if connection_of:
             filters.append(f"(key:connectionOf,value:List({connection_of}))")
@@ -434,10 +592,7 @@ class Linkedin(object):
         if keywords:
             params["keywords"] = keywords
 
-        data = self.search(params, **kwargs)
-
-        results = []
-        for item in data:
+        for item in self.iter_search(params, **kwargs):
             if (
                 not include_private_profiles
                 and (item.get("entityCustomTrackingInfo") or {}).get(
@@ -446,21 +601,17 @@ class Linkedin(object):
                 == "OUT_OF_NETWORK"
             ):
                 continue
-            results.append(
-                {
-                    "urn_id": get_id_from_urn(
-                        get_urn_from_raw_update(item.get("entityUrn", None))
-                    ),
-                    "distance": (item.get("entityCustomTrackingInfo") or {}).get(
-                        "memberDistance", None
-                    ),
-                    "jobtitle": (item.get("primarySubtitle") or {}).get("text", None),
-                    "location": (item.get("secondarySubtitle") or {}).get("text", None),
-                    "name": (item.get("title") or {}).get("text", None),
-                }
-            )
-
-        return results
+            yield {
+                "urn_id": get_id_from_urn(
+                    get_urn_from_raw_update(item.get("entityUrn", None))
+                ),
+                "distance": (item.get("entityCustomTrackingInfo") or {}).get(
+                    "memberDistance", None
+                ),
+                "jobtitle": (item.get("primarySubtitle") or {}).get("text", None),
+                "location": (item.get("secondarySubtitle") or {}).get("text", None),
+                "name": (item.get("title") or {}).get("text", None),
+            }
 
     def search_companies(self, keywords: Optional[List[str]] = None, **kwargs) -> List:
         """Perform a LinkedIn search for companies.
@@ -1049,45 +1200,93 @@ class Linkedin(object):
         :type public_id: str, optional
         :param urn_id: LinkedIn URN ID for a company
         :type urn_id: str, optional
+        :param max_results: Maximum results to return
+        :type max_results: int, optional
 
         :return: List of company update objects
         :rtype: list
         """
-
         if results is None:
             results = []
 
+        results.extend(
+            self.iter_company_updates(
+                public_id=public_id,
+                urn_id=urn_id,
+                max_results=_remaining(max_results, results),
+                offset=len(results),
+            )
+        )
+
+        return results
+
+    def iter_company_updates(
+        self,
+        public_id: Optional[str] = None,
+        urn_id: Optional[str] = None,
+        max_results: Optional[int] = None,
+        offset=0,
+    ) -> Iterator[Dict]:
+        """Fetch company updates (news activity) for a given LinkedIn company, page by page.
+
+        :param public_id: LinkedIn public ID for a company
+        :type public_id: str, optional
+        :param urn_id: LinkedIn URN ID for a company
+        :type urn_id: str, optional
+        :param max_results: Maximum results to yield
+        :type max_results: int, optional
+        :param offset: Index to start from
+        :type offset: int, optional
+
+        :return: Generator of company update objects
+        :rtype: generator
+        """
         params = {
             "companyUniversalName": {public_id or urn_id},
             "q": "companyFeedByUniversalName",
             "moduleKey": "member-share",
-            "count": Linkedin._MAX_UPDATE_COUNT,
-            "start": len(results),
         }
 
-        res = self._fetch(f"/feed/updates", params=params)
+        return self._iter_paged_elements(
+            "/feed/updates",
+            params,
+            Linkedin._MAX_UPDATE_COUNT,
+            max_results=max_results,
+            offset=offset,
+        )
 
-        data = res.json()
+    def get_company_recent_posts(
+        self,
+        public_id: Optional[str] = None,
+        urn_id: Optional[str] = None,
+        limit: int = 3,
+    ) -> List[Dict]:
+        """Fetch the most recent posts of a given LinkedIn company, with their text only.
 
-        if (
-            len(data["elements"]) == 0
-            or (max_results is not None and len(results) >= max_results)
-            or (
-                max_results is not None
-                and len(results) / max_results >= Linkedin._MAX_REPEATED_REQUESTS
-            )
-        ):
-            return results
+        Only `limit` updates are requested, in a single page when `limit` fits in one.
 
-        results.extend(data["elements"])
-        self.logger.debug(f"results grew: {len(results)}")
+        :param public_id: LinkedIn public ID for a company
+        :type public_id: str, optional
+        :param urn_id: LinkedIn URN ID for a company
+        :type urn_id: str, optional
+        :param limit: Maximum number of posts to return, defaults to 3
+        :type limit: int, optional
 
-        return self.get_company_updates(
-            public_id=public_id,
-            urn_id=urn_id,
-            results=results,
-            max_results=max_results,
-        )
+        :return: List of posts, as dicts with the "urn" of the update and the "text" of its commentary
+        :rtype: list
+        """
+        posts = []
+        for update in self.iter_company_updates(
+            public_id=public_id, urn_id=urn_id, max_results=limit
+        ):
+            update_v2 = update.get("value", {}).get(
+                "com.linkedin.voyager.feed.render.UpdateV2", {}
+            )
+            text = update_v2.get("commentary", {}).get("text", {}).get("text", "")
+            urn = update.get("urn") or update_v2.get("updateMetadata", {}).get("urn")
+            posts.append({"urn": urn, "text": text})
+
+        return posts
 
     def get_profile_updates(
         self, public_id=None, urn_id=None, max_results=None, results=None
@@ -1098,44 +1297,55 @@ class Linkedin(object):
         :type public_id: str, optional
         :param urn_id: LinkedIn URN ID for a profile
         :type urn_id: str, optional
+        :param max_results: Maximum results to return
+        :type max_results: int, optional
 
         :return: List of profile update objects
         :rtype: list
         """
-
         if results is None:
             results = []
 
+        results.extend(
+            self.iter_profile_updates(
+                public_id=public_id,
+                urn_id=urn_id,
+                max_results=_remaining(max_results, results),
+                offset=len(results),
+            )
+        )
+
+        return results
+
+    def iter_profile_updates(
+        self, public_id=None, urn_id=None, max_results=None, offset=0
+    ) -> Iterator[Dict]:
+        """Fetch profile updates (newsfeed activity) for a given LinkedIn profile, page by page.
+
+        :param public_id: LinkedIn public ID for a profile
+        :type public_id: str, optional
+        :param urn_id: LinkedIn URN ID for a profile
+        :type urn_id: str, optional
+        :param max_results: Maximum results to yield
+        :type max_results: int, optional
+        :param offset: Index to start from
+        :type offset: int, optional
+
+        :return: Generator of profile update objects
+        :rtype: generator
+        """
         params = {
             "profileId": {public_id or urn_id},
             "q": "memberShareFeed",
             "moduleKey": "member-share",
-            "count": Linkedin._MAX_UPDATE_COUNT,
-            "start": len(results),
         }
 
-        res = self._fetch(f"/feed/updates", params=params)
-
-        data = res.json()
-
-        if (
-            len(data["elements"]) == 0
-            or (max_results is not None and len(results) >= max_results)
-            or (
-                max_results is not None
-                and len(results) / max_results >= Linkedin._MAX_REPEATED_REQUESTS
-            )
-        ):
-            return results
-
-        results.extend(data["elements"])
-        self.logger.debug(f"results grew: {len(results)}")
-
-        return self.get_profile_updates(
-            public_id=public_id,
-            urn_id=urn_id,
-            results=results,
+        return self._iter_paged_elements(
+            "/feed/updates",
+            params,
+            Linkedin._MAX_UPDATE_COUNT,
             max_results=max_results,
+            offset=offset,
         )
 
     def get_current_profile_views(self):
@@ -1285,15 +1495,21 @@ class Linkedin(object):
         message_body: str,
         conversation_urn_id: Optional[str] = None,
         recipients: Optional[List[str]] = None,
+        origin_token: Optional[str] = None,
     ):
         """Send a message to a given conversation.
 
+        Retrying a send with the same `origin_token` lets Linkedin deduplicate
+        it, so a message whose first attempt went through is not sent twice.
+
         :param message_body: Message text to send
         :type message_body: str
         :param conversation_urn_id: LinkedIn URN ID for a conversation
         :type conversation_urn_id: str, optional
         :param recipients: List of profile urn id's
         :type recipients: list, optional
+        :param origin_token: Client generated token (a UUID) identifying the message, defaults to a new one
+        :type origin_token: str, optional
 
         :return: Error state. If True, an error occured.
         :rtype: boolean
@@ -1306,7 +1522,7 @@ class Linkedin(object):
 
         message_event = {
             "eventCreate": {
-                "originToken": str(uuid.uuid4()),
+                "originToken": origin_token or str(uuid.uuid4()),
                 "value": {
                     "com.linkedin.voyager.messaging.create.MessageCreate": {
                         "attributedBody": {
@@ -1318,7 +1534,7 @@ class Linkedin(object):
                 },
                 "trackingId": generate_trackingId_as_charString(),
             },
-            "dedupeByClientGeneratedToken": False,
+            "dedupeByClientGeneratedToken": origin_token is not None,
         }
 
         if conversation_urn_id and not recipients:
@@ -1374,6 +1590,15 @@ class Linkedin(object):
 
         return me_profile
 
+    def is_session_valid(self) -> bool:
+        """Check that Linkedin still accepts the session cookies, with a live request.
+
+        :return: True if the session is valid, False otherwise
+        :rtype: boolean
+        """
+        res = self._fetch(f"/me")
+        return res.status_code == 200
+
     def get_invitations(self, start=0, limit=3):
         """Fetch connection invitations for the currently logged in user.
 
@@ -1733,39 +1958,44 @@ class Linkedin(object):
 
         # Note: This may need to be updated to GraphQL in the future, see https://github.com/tomquirk/linkedin-api/pull/309
         """
-
         if results is None:
             results = []
 
+        results.extend(
+            self.iter_post_reactions(
+                urn_id,
+                max_results=_remaining(max_results, results),
+                offset=len(results),
+            )
+        )
+
+        return results
+
+    def iter_post_reactions(self, urn_id, max_results=None, offset=0) -> Iterator[Dict]:
+        """Fetch social reactions for a given LinkedIn post, page by page.
+
+        :param urn_id: LinkedIn URN ID for a post
+        :type urn_id: str
+        :param max_results: Maximum results to yield
+        :type max_results: int, optional
+        :param offset: Index to start from
+        :type offset: int, optional
+
+        :return: Generator of social reactions
+        :rtype: generator
+        """
         params = {
             "decorationId": "com.linkedin.voyager.dash.deco.social.ReactionsByTypeWithProfileActions-13",
-            "count": 10,
             "q": "reactionType",
-            "start": len(results),
             "threadUrn": f"urn:li:activity:{urn_id}",
         }
 
-        res = self._fetch("/voyagerSocialDashReactions", params=params)
-
-        data = res.json()
-
-        if (
-            len(data["elements"]) == 0
-            or (max_results is not None and len(results) >= max_results)
-            or (
-                max_results is not None
-                and len(results) / max_results >= Linkedin._MAX_REPEATED_REQUESTS
-            )
-        ):
-            return results
-
-        results.extend(data["elements"])
-        self.logger.debug(f"results grew: {len(results)}")
-
-        return self.get_post_reactions(
-            urn_id=urn_id,
-            results=results,
+        return self._iter_paged_elements(
+            "/voyagerSocialDashReactions",
+            params,
+            10,
             max_results=max_results,
+            offset=offset,
         )
 
     def react_to_post(self, post_urn_id, reaction_type="LIKE"):
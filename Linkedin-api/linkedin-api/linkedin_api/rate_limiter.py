@@ -0,0 +1,171 @@
+"""
+Token-bucket rate limiting for Linkedin API requests
+"""
+
+import logging
+import threading
+import time
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class TokenBucket(object):
+    """
+    A single token bucket.
+
+    Tokens are refilled continuously at `rate` tokens per second, up to `burst`
+    tokens. Every request consumes one token and only has to wait when the
+    bucket is empty.
+
+    :param rate: Number of tokens added per second
+    :type rate: float
+    :param burst: Maximum number of tokens the bucket can hold
+    :type burst: int
+    """
+
+    def __init__(self, rate: float, burst: int = 1):
+        if rate <= 0:
+            raise ValueError("rate must be greater than 0")
+        if burst < 1:
+            raise ValueError("burst must be at least 1")
+
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._last_refill = time.monotonic()
+
+    def _refill(self, now: float):
+        elapsed = now - self._last_refill
+        self._tokens = min(self.burst, self._tokens + elapsed * self.rate)
+        self._last_refill = now
+
+    def reserve(self) -> float:
+        """
+        Take a token from the bucket.
+
+        :return: Number of seconds the caller must wait before sending its request
+        :rtype: float
+        """
+        now = time.monotonic()
+        self._refill(now)
+        self._tokens -= 1
+        if self._tokens >= 0:
+            return 0.0
+
+        # the bucket is in debt: the caller waits until its token is refilled
+        return -self._tokens / self.rate
+
+
+class RateLimiter(object):
+    """
+    Rate limiter for a single LinkedIn account.
+
+    Keeps a separate token bucket for read requests (GET) and write requests
+    (POST, e.g. `send_message` or `add_connection`). Share one instance between
+    every client using the same account.
+
+    The limiter is thread-safe, and keeps track of how long requests have waited
+    so the budgets can be tuned.
+
+    :param read_rate: Read requests allowed per second, defaults to 0.5
+    :type read_rate: float, optional
+    :param read_burst: Read requests allowed back-to-back, defaults to 5
+    :type read_burst: int, optional
+    :param write_rate: Write requests allowed per second, defaults to 0.1
+    :type write_rate: float, optional
+    :param write_burst: Write requests allowed back-to-back, defaults to 2
+    :type write_burst: int, optional
+    """
+
+    READ = "read"
+    WRITE = "write"
+
+    def __init__(
+        self,
+        *,
+        read_rate: float = 0.5,
+        read_burst: int = 5,
+        write_rate: float = 0.1,
+        write_burst: int = 2,
+    ):
+        self._buckets = {
+            RateLimiter.READ: TokenBucket(read_rate, read_burst),
+            RateLimiter.WRITE: TokenBucket(write_rate, write_burst),
+        }
+        self._lock = threading.Lock()
+        self._stats = {
+            kind: {"requests": 0, "waited": 0, "wait_time": 0.0}
+            for kind in self._buckets
+        }
+
+    def reserve(self, kind: str = READ) -> float:
+        """
+        Reserve a request slot without sleeping.
+
+        Useful for callers that wait by other means (e.g. `asyncio.sleep`).
+
+        :param kind: Budget to take from, "read" or "write"
+        :type kind: str, optional
+
+        :return: Number of seconds to wait before sending the request
+        :rtype: float
+        """
+        if kind not in self._buckets:
+            raise ValueError(f"Unknown rate limit budget: {kind}")
+
+        with self._lock:
+            delay = self._buckets[kind].reserve()
+            stats = self._stats[kind]
+            stats["requests"] += 1
+            if delay > 0:
+                stats["waited"] += 1
+                stats["wait_time"] += delay
+
+        if delay > 0:
+            logger.debug(f"rate limit [{kind}] exhausted, waiting {delay:.2f}s")
+
+        return delay
+
+    def acquire(self, kind: str = READ) -> float:
+        """
+        Block until a request of the given kind may be sent.
+
+        :param kind: Budget to take from, "read" or "write"
+        :type kind: str, optional
+
+        :return: Number of seconds waited
+        :rtype: float
+        """
+        delay = self.reserve(kind)
+        if delay > 0:
+            time.sleep(delay)
+
+        return delay
+
+    @property
+    def stats(self) -> Dict[str, Dict]:
+        """
+        Wait statistics per budget.
+
+        `requests` is the number of requests seen, `waited` how many of them had
+        to wait and `wait_time` the total seconds spent waiting.
+        """
+        with self._lock:
+            return {kind: dict(stats) for kind, stats in self._stats.items()}
+
+    def wait_time(self, kind: Optional[str] = None) -> float:
+        """
+        Total seconds spent waiting, for one budget or all of them.
+
+        :param kind: "read" or "write", defaults to all budgets
+        :type kind: str, optional
+
+        :return: Seconds waited
+        :rtype: float
+        """
+        stats = self.stats
+        if kind:
+            return stats[kind]["wait_time"]
+
+        return sum(s["wait_time"] for s in stats.values())
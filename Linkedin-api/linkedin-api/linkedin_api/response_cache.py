@@ -0,0 +1,202 @@
+"""
+Persistent cache for read-only Linkedin API responses
+"""
+
+import hashlib
+import json
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+from typing import Dict, Optional
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+import linkedin_api.settings as settings
+
+logger = logging.getLogger(__name__)
+
+# Time to live (seconds) of cached responses, by URI pattern.
+# Only GET requests to URIs matching one of these patterns are cached.
+DEFAULT_TTLS = {
+    r"^/identity/profiles/[^/]+/profileView": 7 * 24 * 60 * 60,
+    r"^/identity/profiles/[^/]+/skills": 7 * 24 * 60 * 60,
+    r"^/identity/profiles/[^/]+/profileContactInfo": 7 * 24 * 60 * 60,
+    r"^/organization/companies": 24 * 60 * 60,
+    r"^/feed/updates": 6 * 60 * 60,
+}
+
+
+class ResponseCache(object):
+    """
+    Class to act as an on-disk cache for Linkedin API responses, backed by SQLite.
+
+    Entries are keyed by method, URL, query parameters and `accept` header.
+    Each URI pattern has its own time to live, and the least recently used
+    entries are evicted once the cache grows over `max_size` bytes.
+
+    :param path: Path of the SQLite database, defaults to `settings.RESPONSE_CACHE_PATH`
+    :type path: str, optional
+    :param ttls: Time to live in seconds by URI regex, defaults to `DEFAULT_TTLS`
+    :type ttls: dict, optional
+    :param max_size: Maximum total size of cached bodies in bytes, defaults to 100MB
+    :type max_size: int, optional
+    """
+
+    def __init__(
+        self,
+        path: str = "",
+        ttls: Optional[Dict[str, int]] = None,
+        max_size: int = 100 * 1024 * 1024,
+    ):
+        self.path = path or settings.RESPONSE_CACHE_PATH
+        self.ttls = [
+            (re.compile(pattern), ttl)
+            for pattern, ttl in (DEFAULT_TTLS if ttls is None else ttls).items()
+        ]
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+
+        directory = os.path.dirname(self.path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(self.path, check_same_thread=False)
+        self._db.execute(
+            """
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                url TEXT NOT NULL,
+                status_code INTEGER NOT NULL,
+                headers TEXT NOT NULL,
+                body BLOB NOT NULL,
+                size INTEGER NOT NULL,
+                expires_at REAL NOT NULL,
+                last_access REAL NOT NULL
+            )
+            """
+        )
+        self._db.execute(
+            "CREATE INDEX IF NOT EXISTS responses_last_access ON responses (last_access)"
+        )
+        self._db.commit()
+
+    def ttl_for(self, uri: str) -> Optional[int]:
+        """Return the time to live for a URI, or None if it must not be cached"""
+        for pattern, ttl in self.ttls:
+            if pattern.search(uri):
+                return ttl
+        return None
+
+    @staticmethod
+    def key(method: str, url: str, params=None, headers=None) -> str:
+        """Return the cache key of a request"""
+        prepared = requests.Request(method, url, params=params).prepare()
+        accept = (headers or {}).get("accept", "")
+        raw = f"{method.upper()} {prepared.url} {accept}"
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[requests.Response]:
+        """Return the cached response for a key, if there is a fresh one"""
+        now = time.time()
+        with self._lock:
+            row = self._db.execute(
+                "SELECT url, status_code, headers, body, expires_at FROM responses WHERE key = ?",
+                (key,),
+            ).fetchone()
+            if row is None or row[4] <= now:
+                if row is not None:
+                    self._db.execute("DELETE FROM responses WHERE key = ?", (key,))
+                    self._db.commit()
+                self.misses += 1
+                return None
+
+            self._db.execute(
+                "UPDATE responses SET last_access = ? WHERE key = ?", (now, key)
+            )
+            self._db.commit()
+            self.hits += 1
+
+        url, status_code, headers, body, _ = row
+        res = requests.Response()
+        res.url = url
+        res.status_code = status_code
+        res.headers = CaseInsensitiveDict(json.loads(headers))
+        res._content = body
+        res.encoding = requests.utils.get_encoding_from_headers(res.headers)
+        return res
+
+    def set(self, key: str, res: requests.Response, ttl: int):
+        """Store a response. Only successful responses are cached."""
+        if res.status_code != 200:
+            return
+
+        now = time.time()
+        headers = {
+            name: value
+            for name, value in res.headers.items()
+            if name.lower() == "content-type"
+        }
+        body = res.content
+        with self._lock:
+            self._db.execute(
+                "REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    key,
+                    res.url,
+                    res.status_code,
+                    json.dumps(headers),
+                    body,
+                    len(body),
+                    now + ttl,
+                    now,
+                ),
+            )
+            self._evict()
+            self._db.commit()
+
+    def _evict(self):
+        """Drop expired entries, then least recently used ones until under `max_size`"""
+        self._db.execute("DELETE FROM responses WHERE expires_at <= ?", (time.time(),))
+        (total,) = self._db.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM responses"
+        ).fetchone()
+        if total <= self.max_size:
+            return
+
+        evicted = []
+        for key, size in self._db.execute(
+            "SELECT key, size FROM responses ORDER BY last_access"
+        ).fetchall():
+            if total <= self.max_size:
+                break
+            evicted.append((key,))
+            total -= size
+
+        self._db.executemany("DELETE FROM responses WHERE key = ?", evicted)
+        logger.debug(f"evicted {len(evicted)} cached responses")
+
+    def clear(self):
+        """Remove every cached response"""
+        with self._lock:
+            self._db.execute("DELETE FROM responses")
+            self._db.commit()
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        """Hit and miss counters, and the number and total size of cached responses"""
+        with self._lock:
+            entries, size = self._db.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses"
+            ).fetchone()
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "entries": entries,
+            "size": size,
+        }
@@ -0,0 +1,66 @@
+import asyncio
+import threading
+import time
+import pytest
+
+from linkedin_api import AsyncLinkedin, Linkedin, RateLimiter
+
+
+def test_constructor():
+    limiter = RateLimiter()
+    api = AsyncLinkedin(
+        "test", "test", authenticate=False, max_concurrency=4, rate_limiter=limiter
+    )
+    assert api.rate_limiter is limiter
+    assert api.api.rate_limiter is limiter
+
+
+def test_invalid_concurrency():
+    with pytest.raises(ValueError):
+        AsyncLinkedin("test", "test", authenticate=False, max_concurrency=0)
+
+
+def test_from_client_requires_a_rate_limiter():
+    with pytest.raises(ValueError):
+        AsyncLinkedin.from_client(Linkedin("test", "test", authenticate=False))
+
+    limiter = RateLimiter()
+    sync_api = Linkedin("test", "test", authenticate=False, rate_limiter=limiter)
+    api = AsyncLinkedin.from_client(sync_api)
+    assert api.api is sync_api
+    assert sync_api.rate_limiter is limiter
+
+
+def test_concurrency_is_bounded():
+    api = AsyncLinkedin.from_client(
+        Linkedin("test", "test", authenticate=False, rate_limiter=RateLimiter()),
+        max_concurrency=2,
+    )
+    lock = threading.Lock()
+    # calls wait for each other in pairs, so a serial implementation times out
+    barrier = threading.Barrier(2, timeout=5)
+    in_flight = 0
+    max_in_flight = 0
+
+    def fake_get_profile(public_id=None, urn_id=None):
+        nonlocal in_flight, max_in_flight
+        with lock:
+            in_flight += 1
+            max_in_flight = max(max_in_flight, in_flight)
+        barrier.wait()
+        time.sleep(0.01)
+        with lock:
+            in_flight -= 1
+        return {"urn_id": urn_id}
+
+    api.api.get_profile = fake_get_profile
+
+    async def run():
+        async with api:
+            return await asyncio.gather(
+                *(api.get_profile(urn_id=str(i)) for i in range(6))
+            )
+
+    profiles = asyncio.run(run())
+    assert [p["urn_id"] for p in profiles] == [str(i) for i in range(6)]
+    assert max_in_flight == 2
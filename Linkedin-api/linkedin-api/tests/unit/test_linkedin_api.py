@@ -1,3 +1,4 @@
+import json
 import os
 import sys
 import pytest
@@ -8,3 +9,163 @@ from linkedin_api import Linkedin
 def test_constructor():
     api = Linkedin("test", "test", authenticate=False)
     assert api
+
+
+class FakeResponse:
+    def __init__(self, data, status_code=200):
+        self._data = data
+        self.status_code = status_code
+
+    def json(self):
+        return self._data
+
+
+def search_page(urn_ids):
+    items = [
+        {
+            "_type": "com.linkedin.voyager.dash.search.SearchItem",
+            "item": {
+                "entityResult": {
+                    "_type": "com.linkedin.voyager.dash.search.EntityResultViewModel",
+                    "entityUrn": f"urn:li:fsd_entityResultViewModel:(urn:li:fsd_profile:{urn_id},SEARCH_SRP,DEFAULT)",
+                    "title": {"text": urn_id},
+                }
+            },
+        }
+        for urn_id in urn_ids
+    ]
+    return {
+        "data": {
+            "searchDashClustersByAll": {
+                "_type": "com.linkedin.restli.common.CollectionResponse",
+                "elements": [
+                    {
+                        "_type": "com.linkedin.voyager.dash.search.SearchClusterViewModel",
+                        "items": items,
+                    }
+                ],
+            }
+        }
+    }
+
+
+def test_iter_search_people_is_lazy():
+    api = Linkedin("test", "test", authenticate=False)
+    pages = [search_page(["a", "b"]), search_page(["c"]), search_page([])]
+    requests = []
+
+    def fake_fetch(uri, **kwargs):
+        requests.append(uri)
+        return FakeResponse(pages[len(requests) - 1])
+
+    api._fetch = fake_fetch
+
+    results = api.iter_search_people(keywords="test")
+    assert next(results)["urn_id"] == "a"
+    assert len(requests) == 1
+
+    assert [r["urn_id"] for r in results] == ["b", "c"]
+    assert len(requests) == 3
+
+
+def test_search_people_limit():
+    api = Linkedin("test", "test", authenticate=False)
+    api._fetch = lambda uri, **kwargs: FakeResponse(search_page(["a", "b", "c"]))
+
+    results = api.search_people(keywords="test", limit=3)
+    assert [r["urn_id"] for r in results] == ["a", "b", "c"]
+
+
+def test_get_company_updates_stops_at_max_results():
+    api = Linkedin("test", "test", authenticate=False)
+    requests = []
+
+    def fake_fetch(uri, params=None, **kwargs):
+        requests.append(params)
+        start, count = params["start"], params["count"]
+        return FakeResponse(
+            {"elements": [{"id": i} for i in range(start, start + count)]}
+        )
+
+    api._fetch = fake_fetch
+
+    updates = api.get_company_updates(public_id="test", max_results=150)
+    assert [u["id"] for u in updates] == list(range(150))
+    assert [(p["start"], p["count"]) for p in requests] == [(0, 100), (100, 50)]
+
+
+def test_iter_profile_updates_stops_on_empty_page():
+    api = Linkedin("test", "test", authenticate=False)
+    pages = [{"elements": [{"id": 1}, {"id": 2}]}, {"elements": []}]
+    requests = []
+
+    def fake_fetch(uri, params=None, **kwargs):
+        requests.append(params)
+        return FakeResponse(pages[len(requests) - 1])
+
+    api._fetch = fake_fetch
+
+    updates = api.iter_profile_updates(public_id="test")
+    assert [u["id"] for u in updates] == [1, 2]
+    assert len(requests) == 2
+
+
+def test_get_company_recent_posts_fetches_one_page():
+    api = Linkedin("test", "test", authenticate=False)
+    requests = []
+
+    def update(i):
+        return {
+            "urn": f"urn:li:activity:{i}",
+            "value": {
+                "com.linkedin.voyager.feed.render.UpdateV2": {
+                    "commentary": {"text": {"text": f"post {i}"}},
+                    "actor": {"name": {"text": "test"}},
+                }
+            },
+        }
+
+    def fake_fetch(uri, params=None, **kwargs):
+        requests.append(params)
+        return FakeResponse({"elements": [update(0), {"urn": "urn:li:activity:1"}]})
+
+    api._fetch = fake_fetch
+
+    posts = api.get_company_recent_posts(public_id="test", limit=2)
+    assert posts == [
+        {"urn": "urn:li:activity:0", "text": "post 0"},
+        {"urn": "urn:li:activity:1", "text": ""},
+    ]
+    assert [(p["start"], p["count"]) for p in requests] == [(0, 2)]
+
+
+def test_send_message_origin_token():
+    api = Linkedin("test", "test", authenticate=False)
+    payloads = []
+
+    def fake_post(uri, data=None, **kwargs):
+        payloads.append(json.loads(data)["conversationCreate"])
+        return FakeResponse({}, status_code=201)
+
+    api._post = fake_post
+
+    assert not api.send_message("hi", recipients=["urn"], origin_token="token")
+    assert not api.send_message("hi", recipients=["urn"])
+
+    assert payloads[0]["eventCreate"]["originToken"] == "token"
+    assert payloads[0]["dedupeByClientGeneratedToken"] is True
+    assert payloads[1]["eventCreate"]["originToken"] != "token"
+    assert payloads[1]["dedupeByClientGeneratedToken"] is False
+
+
+def test_is_session_valid_checks_the_status_code():
+    api = Linkedin("test", "test", authenticate=False)
+    responses = [
+        FakeResponse({"miniProfile": {}}),
+        FakeResponse({"status": 401}, status_code=401),
+    ]
+    api._fetch = lambda uri, **kwargs: responses.pop(0)
+
+    assert api.is_session_valid()
+    # An error body is still a truthy JSON document
+    assert not api.is_session_valid()
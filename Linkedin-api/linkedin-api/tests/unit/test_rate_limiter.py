@@ -0,0 +1,42 @@
+import pytest
+
+from linkedin_api import Linkedin, RateLimiter
+from linkedin_api.rate_limiter import TokenBucket
+
+
+def test_bucket_allows_burst():
+    bucket = TokenBucket(rate=1, burst=3)
+    assert [bucket.reserve() for _ in range(3)] == [0, 0, 0]
+    assert bucket.reserve() > 0
+
+
+def test_bucket_invalid_settings():
+    with pytest.raises(ValueError):
+        TokenBucket(rate=0)
+    with pytest.raises(ValueError):
+        TokenBucket(rate=1, burst=0)
+
+
+def test_separate_read_and_write_budgets():
+    limiter = RateLimiter(read_rate=1, read_burst=1, write_rate=1, write_burst=1)
+    assert limiter.reserve(RateLimiter.READ) == 0
+    assert limiter.reserve(RateLimiter.WRITE) == 0
+    assert limiter.reserve(RateLimiter.READ) > 0
+
+    stats = limiter.stats
+    assert stats["read"]["requests"] == 2
+    assert stats["read"]["waited"] == 1
+    assert stats["write"]["waited"] == 0
+    assert limiter.wait_time("read") > 0
+    assert limiter.wait_time() == limiter.wait_time("read")
+
+
+def test_unknown_budget():
+    with pytest.raises(ValueError):
+        RateLimiter().reserve("delete")
+
+
+def test_constructor_with_rate_limiter():
+    limiter = RateLimiter()
+    api = Linkedin("test", "test", authenticate=False, rate_limiter=limiter)
+    assert api.rate_limiter is limiter
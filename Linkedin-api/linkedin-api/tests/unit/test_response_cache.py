@@ -0,0 +1,83 @@
+import requests
+
+from linkedin_api import Linkedin, ResponseCache
+
+
+def mock_response(body=b'{"profile": "test"}', status_code=200):
+    res = requests.Response()
+    res.url = "https://www.linkedin.com/voyager/api/identity/profiles/test/profileView"
+    res.status_code = status_code
+    res.headers["content-type"] = "application/json"
+    res._content = body
+    return res
+
+
+def test_ttl_for():
+    cache = ResponseCache(ttls={r"^/identity/profiles/[^/]+/profileView": 60})
+    assert cache.ttl_for("/identity/profiles/test/profileView") == 60
+    assert cache.ttl_for("/messaging/conversations") is None
+
+
+def test_key_depends_on_params():
+    url = "https://www.linkedin.com/voyager/api/feed/updates"
+    assert ResponseCache.key("GET", url, {"start": 0}) == ResponseCache.key(
+        "GET", url, {"start": 0}
+    )
+    assert ResponseCache.key("GET", url, {"start": 0}) != ResponseCache.key(
+        "GET", url, {"start": 100}
+    )
+
+
+def test_get_and_set(tmp_path):
+    cache = ResponseCache(path=str(tmp_path / "cache.sqlite"))
+    assert cache.get("key") is None
+
+    cache.set("key", mock_response(), ttl=60)
+    res = cache.get("key")
+    assert res.status_code == 200
+    assert res.json() == {"profile": "test"}
+    assert cache.stats["hits"] == 1
+    assert cache.stats["misses"] == 1
+
+
+def test_errors_and_expired_entries_are_not_served(tmp_path):
+    cache = ResponseCache(path=str(tmp_path / "cache.sqlite"))
+    cache.set("error", mock_response(status_code=500), ttl=60)
+    cache.set("expired", mock_response(), ttl=-1)
+    assert cache.get("error") is None
+    assert cache.get("expired") is None
+
+
+def test_lru_eviction(tmp_path):
+    body = b'{"profile": "test"}'
+    cache = ResponseCache(path=str(tmp_path / "cache.sqlite"), max_size=2 * len(body))
+    cache.set("a", mock_response(body), ttl=60)
+    cache.set("b", mock_response(body), ttl=60)
+    cache.get("a")
+    cache.set("c", mock_response(body), ttl=60)
+
+    assert cache.get("a") is not None
+    assert cache.get("b") is None
+    assert cache.get("c") is not None
+
+
+def test_fetch_uses_cache(tmp_path):
+    cache = ResponseCache(path=str(tmp_path / "cache.sqlite"))
+    api = Linkedin("test", "test", authenticate=False, response_cache=cache)
+    calls = []
+
+    def fake_get(url, **kwargs):
+        calls.append(url)
+        return mock_response()
+
+    api.client.session.get = fake_get
+    api._evade = lambda kind: None
+
+    for _ in range(2):
+        res = api._fetch("/identity/profiles/test/profileView")
+        assert res.json() == {"profile": "test"}
+    assert len(calls) == 1
+
+    api._fetch("/messaging/conversations")
+    api._fetch("/messaging/conversations")
+    assert len(calls) == 3
@@ -0,0 +1,89 @@
+import os
+import threading
+import time
+from dotenv import load_dotenv
+from requests.adapters import HTTPAdapter
+from requests.utils import cookiejar_from_dict
+from linkedin_api import Linkedin, RateLimiter, ResponseCache
+from linkedin_api.cookie_repository import LinkedinSessionExpired
+
+# Seconds between live checks that the session cookies are still accepted
+HEALTH_CHECK_INTERVAL = 15 * 60
+# Connections kept alive per host, enough for the concurrent profile fetches of gathering
+POOL_SIZE = 8
+SESSION_EXPIRED = "LinkedIn session cookies expired, update LI_AT_VALUE and JSESSIONID in .env"
+
+# One rate limiter and response cache for every client of the process, rebuilt ones included
+rate_limiter = RateLimiter()
+_response_cache = None
+
+_api = None
+_api_cookies = None
+_last_check = 0.0
+# Cookies LinkedIn rejected, refused until the environment holds new ones
+_expired_cookies = None
+_lock = threading.RLock()
+
+def session_cookies():
+    """Session cookies from the environment (.env): li_at and JSESSIONID."""
+    load_dotenv(override=True)
+    return {"li_at": os.getenv("LI_AT_VALUE"), "JSESSIONID": os.getenv("JSESSIONID")}
+
+def build_linkedin(cookies):
+    """Build a LinkedIn client from session cookies, with a pooled session."""
+    global _response_cache
+    if _response_cache is None:
+        _response_cache = ResponseCache()
+    api = Linkedin(username="", password="", cookies=cookiejar_from_dict(cookies),
+                   rate_limiter=rate_limiter, response_cache=_response_cache)
+    adapter = HTTPAdapter(pool_connections=POOL_SIZE, pool_maxsize=POOL_SIZE)
+    api.client.session.mount("https://", adapter)
+    return api
+
+def is_healthy(api):
+    """Return True if LinkedIn still accepts the session cookies of the client."""
+    try:
+        return api.is_session_valid()
+    except Exception as e:
+        print(f"LinkedIn session check failed: {e}")
+        return False
+
+def get_linkedin():
+    """
+    Return the process-wide LinkedIn client, shared by JD generation, candidate
+    gathering and messaging.
+
+    The client is authenticated once and reused, keeping its connections alive.
+    It is rebuilt when the cookies in the environment change. When the periodic
+    health check finds that LinkedIn no longer accepts them, the client is
+    dropped and LinkedinSessionExpired is raised until the cookies are updated.
+    """
+    global _api, _api_cookies, _last_check, _expired_cookies
+    with _lock:
+        cookies = session_cookies()
+        if cookies == _expired_cookies:
+            raise LinkedinSessionExpired(SESSION_EXPIRED)
+        if _api is None or cookies != _api_cookies:
+            _api, _api_cookies = build_linkedin(cookies), cookies
+            _last_check = time.time()
+            return _api
+        if time.time() - _last_check <= HEALTH_CHECK_INTERVAL:
+            return _api
+        # Claimed before checking, so other callers keep using the client meanwhile
+        _last_check = time.time()
+        api = _api
+
+    # Checked outside the lock, as it is a network round trip
+    if is_healthy(api):
+        return api
+    with _lock:
+        if _api is api:
+            reset_linkedin()
+            _expired_cookies = cookies
+    raise LinkedinSessionExpired(SESSION_EXPIRED)
+
+def reset_linkedin():
+    """Drop the shared client, e.g. after a failed health check; the next get_linkedin() rebuilds it."""
+    global _api, _api_cookies
+    with _lock:
+        _api, _api_cookies = None, None
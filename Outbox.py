@@ -0,0 +1,106 @@
+import sqlite3
+import threading
+import time
+import uuid
+
+# Message states: drafted -> queued -> sent, or failed and queued again until max_attempts
+DRAFTED = "drafted"
+QUEUED = "queued"
+SENT = "sent"
+FAILED = "failed"
+
+class Outbox:
+    """
+    Durable outbox of LinkedIn messages, backed by SQLite.
+
+    Each message is keyed by the candidate's `urn id` and the hash of the job
+    description, and keeps the origin token it is sent with. A send retried
+    after a crash or a failure reuses that token, so LinkedIn deduplicates it
+    and a candidate is messaged at most once per job. Failed sends are retried
+    up to `max_attempts` times, `backoff` seconds apart, doubling each time.
+
+    :param path: Path of the SQLite database
+    :param max_attempts: Maximum number of send attempts of a message
+    :param backoff: Seconds to wait before the first retry
+    """
+
+    def __init__(self, path=".outbox.sqlite", max_attempts=3, backoff=30):
+        self.path = path
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.row_factory = sqlite3.Row
+        self._db.execute(
+            """
+            CREATE TABLE IF NOT EXISTS messages (
+                urn_id TEXT NOT NULL,
+                jd_hash TEXT NOT NULL,
+                name TEXT,
+                message TEXT NOT NULL,
+                origin_token TEXT NOT NULL,
+                state TEXT NOT NULL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                next_attempt_at REAL NOT NULL DEFAULT 0,
+                last_error TEXT,
+                updated_at REAL NOT NULL,
+                PRIMARY KEY (urn_id, jd_hash)
+            )
+            """
+        )
+        self._db.commit()
+
+    def get(self, urn_id, jd_hash):
+        """Return the outbox entry of a candidate for a job, or None."""
+        with self._lock:
+            row = self._db.execute(
+                "SELECT * FROM messages WHERE urn_id = ? AND jd_hash = ?", (urn_id, jd_hash)
+            ).fetchone()
+        return dict(row) if row else None
+
+    def draft(self, urn_id, jd_hash, name, message):
+        """Record a drafted message with a new origin token, unless the candidate already has one."""
+        with self._lock:
+            self._db.execute(
+                "INSERT OR IGNORE INTO messages (urn_id, jd_hash, name, message, origin_token, state, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (urn_id, jd_hash, name, message, str(uuid.uuid4()), DRAFTED, time.time()),
+            )
+            self._db.commit()
+        return self.get(urn_id, jd_hash)
+
+    def _update(self, urn_id, jd_hash, **values):
+        values["updated_at"] = time.time()
+        with self._lock:
+            self._db.execute(
+                f"UPDATE messages SET {', '.join(f'{column} = ?' for column in values)} "
+                "WHERE urn_id = ? AND jd_hash = ?",
+                list(values.values()) + [urn_id, jd_hash],
+            )
+            self._db.commit()
+
+    def mark_queued(self, urn_id, jd_hash):
+        self._update(urn_id, jd_hash, state=QUEUED)
+
+    def mark_sent(self, urn_id, jd_hash):
+        self._update(urn_id, jd_hash, state=SENT, last_error=None)
+
+    def mark_failed(self, urn_id, jd_hash, error):
+        """Record a failed send and when it may be retried."""
+        entry = self.get(urn_id, jd_hash)
+        attempts = entry["attempts"] + 1
+        self._update(urn_id, jd_hash, state=FAILED, attempts=attempts, last_error=str(error),
+                     next_attempt_at=time.time() + self.backoff * 2 ** (attempts - 1))
+
+    def is_sendable(self, entry):
+        """Return True if a message still has to be sent, now or after a backoff."""
+        return entry["state"] != SENT and entry["attempts"] < self.max_attempts
+
+    def entries(self, jd_hash, urn_ids):
+        """Return the outbox entries of the given candidates for a job."""
+        entries = []
+        for urn_id in urn_ids:
+            entry = self.get(urn_id, jd_hash)
+            if entry:
+                entries.append(entry)
+        return entries
@@ -1,10 +1,63 @@
+import csv
+import hashlib
+import heapq
+import itertools
+import json
+import multiprocessing
+import numpy as np
+import os
 import pandas as pd
-from sentence_transformers import SentenceTransformer
-from sklearn.metrics.pairwise import cosine_similarity
 import re
+import tempfile
+import threading
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from EmbeddingCache import EmbeddingCache
+from Encoders import load_encoder
+from ScoreStore import ScoreStore
 
-# Load the Sentence-BERT model for embeddings
-model = SentenceTransformer('all-MiniLM-L6-v2')
+# Sentence-BERT model for embeddings, loaded on first use by get_model()
+MODEL_NAME = 'all-MiniLM-L6-v2'
+# Encoder backend running the model: "torch", or "onnx" for int8 ONNX Runtime on the CPU
+ENCODER_BACKEND = os.getenv("RANKER_BACKEND", "torch")
+# Threads the encoder runs on, None for the backend's default of one per core
+ENCODER_THREADS = None
+_model = None
+_model_lock = threading.Lock()
+
+def get_model():
+    """Return the process-wide Sentence-BERT model, loading it on first use."""
+    global _model
+    if _model is None:
+        with _model_lock:
+            if _model is None:
+                _model = load_encoder(MODEL_NAME, ENCODER_BACKEND, ENCODER_THREADS)
+    return _model
+
+def warm_model():
+    """Load the model ahead of its first use, e.g. from a background thread."""
+    get_model()
+
+def use_backend(backend, num_threads=None):
+    """Switch the encoder backend and its thread count, the model is loaded again on next use."""
+    global ENCODER_BACKEND, ENCODER_THREADS, _model, _embedding_cache
+    with _model_lock:
+        ENCODER_BACKEND = backend
+        ENCODER_THREADS = num_threads
+        _model = None
+        _embedding_cache = None
+
+# Persistent embedding store consulted before encoding, created by get_embedding_cache()
+_embedding_cache = None
+
+def get_embedding_cache():
+    """Return the process-wide embedding cache of the ranker model."""
+    global _embedding_cache
+    with _model_lock:
+        if _embedding_cache is None:
+            # Each backend gives slightly different embeddings, so they are cached apart
+            cache_name = MODEL_NAME if ENCODER_BACKEND == "torch" else f"{MODEL_NAME}@{ENCODER_BACKEND}"
+            _embedding_cache = EmbeddingCache(cache_name)
+    return _embedding_cache
 
 def preprocess_text(text):
     """Preprocess text by removing special characters and converting to lowercase."""
@@ -15,47 +68,139 @@ def preprocess_text(text):
 
 def get_embedding(text):
     """Generate an embedding for the given text."""
-    return model.encode(preprocess_text(text))
+    return get_model().encode(preprocess_text(text))
 
-def ranker_sort(job_description_file, candidate_csv_file, output_csv_file):
-    # Load job description
-    with open(job_description_file, "r", encoding="utf-8") as f:
-        job_description = f.read()
-    
-    # Generate embedding for the job description
-    job_desc_embedding = get_embedding(job_description)
+def get_embeddings(texts, batch_size=64, cache=None):
+    """
+    Generate embeddings for many texts with batched encode calls.
 
-    # Load candidate data
-    candidates_df = pd.read_csv(candidate_csv_file)
+    Texts are preprocessed and deduplicated first, so each distinct text is
+    encoded once. Texts found in `cache` (an EmbeddingCache) are not encoded
+    again, and new embeddings are added to it. Returns a matrix with one
+    embedding row per input text, in order.
+    """
+    processed = [preprocess_text(text) for text in texts]
+    unique_texts = list(dict.fromkeys(processed))
 
-    # Define field mappings (adjust these based on your CSV file's column names)
-    field_mappings = {
-        "skills": "Skills",
-        "job title": "Job Title",
-        "experience_str": "Experience",
-        "location": "Location",
-        "certifications": "Certifications",
-        "education_str": "Education",
-        "past_job_titles_str": "Past Job Titles"
-    }
+    found = cache.get_many(unique_texts) if cache else {}
+    missing = [text for text in unique_texts if text not in found]
+    if missing:
+        encoded = np.asarray(get_model().encode(missing, batch_size=batch_size), dtype=np.float32)
+        found.update(zip(missing, encoded))
+        if cache:
+            cache.put_many(missing, encoded)
+    elif cache:
+        cache.save()
 
-    # Preprocess candidate fields
-    for field in field_mappings.values():
+    if not processed:
+        return np.zeros((0, 0), dtype=np.float32)
+    embeddings = np.stack([found[text] for text in unique_texts])
+    rows = {text: i for i, text in enumerate(unique_texts)}
+    return embeddings[[rows[text] for text in processed]]
+
+def normalize_rows(matrix):
+    """Scale each row to unit length. All-zero rows stay zero, as with sklearn's cosine_similarity."""
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1
+    return matrix / norms
+
+def score_column(field):
+    """Name of the score column of a candidate field."""
+    return f"{field.lower().replace(' ', '_')}_score"
+
+# Lines that start a new JD section: markdown headings and lines that are only bold text
+SECTION_HEADING = re.compile(r"^\s*(#{1,6}\s+.+|\*\*[^*]+\*\*:?)\s*$")
+
+def split_job_description(job_description, max_words=128):
+    """
+    Split a markdown job description into chunks short enough to be embedded whole.
+
+    The text is split into sections at headings, and each section into windows
+    of whole sentences or bullet lines of up to `max_words` words, as the model
+    truncates long inputs. Each window starts with its section heading.
+    """
+    sections = []
+    heading, lines = "", []
+    for line in job_description.splitlines():
+        if SECTION_HEADING.match(line):
+            sections.append((heading, lines))
+            heading, lines = line.strip(" #*:"), []
+        elif line.strip():
+            lines.append(line.strip())
+    sections.append((heading, lines))
+
+    chunks = []
+    for heading, lines in sections:
+        sentences = [sentence for line in lines for sentence in re.split(r"(?<=[.!?])\s+", line)]
+        window = []
+        for sentence in sentences:
+            if window and len(" ".join(window + [sentence]).split()) > max_words:
+                chunks.append(" ".join([heading] + window).strip())
+                window = []
+            window.append(sentence)
+        if window:
+            chunks.append(" ".join([heading] + window).strip())
+    return chunks or [job_description]
+
+def job_description_chunks(job_description, jd_sections=None, max_words=128):
+    """
+    Chunks of a job description, or of its already known sections such as the
+    dict returned by messageAgent.parse_job_description.
+    """
+    if not jd_sections:
+        return split_job_description(job_description, max_words=max_words)
+    chunks = []
+    for name, text in jd_sections.items():
+        if text and not text.endswith("Not specified"):
+            chunks.extend(split_job_description(f"## {name.replace('_', ' ')}\n{text}", max_words=max_words))
+    return chunks or split_job_description(job_description, max_words=max_words)
+
+def pool_scores(field_embeddings, jd_embeddings, pooling="max"):
+    """
+    Score every field against the normalized JD chunk embeddings.
+
+    With "max" pooling a field scores its similarity with the best-matching
+    chunk, with "mean" pooling its similarity with the mean of the chunks.
+
+    :return: Field scores with shape (fields, candidates)
+    """
+    if pooling == "max":
+        return (field_embeddings @ jd_embeddings.T).max(axis=-1, initial=-1.0)
+    if pooling == "mean":
+        (pooled,) = normalize_rows(jd_embeddings.mean(axis=0, keepdims=True))
+        return field_embeddings @ pooled
+    raise ValueError(f"Unknown pooling {pooling!r}, expected 'max' or 'mean'")
+
+# Define field mappings (adjust these based on your CSV file's column names)
+FIELD_MAPPINGS = {
+    "skills": "Skills",
+    "job title": "Job Title",
+    "experience_str": "Experience",
+    "location": "Location",
+    "certifications": "Certifications",
+    "education_str": "Education",
+    "past_job_titles_str": "Past Job Titles"
+}
+
+# Define weights for scoring
+WEIGHTS = {
+    "Skills": 0.3,
+    "Job Title": 0.2,
+    "Experience": 0.2,
+    "Location": 0.1,
+    "Certifications": 0.05,
+    "Education": 0.05,
+    "Past Job Titles": 0.1
+}
+
+def preprocess_candidates(candidates_df):
+    """Preprocess the text of every candidate field, in place."""
+    for field in FIELD_MAPPINGS.values():
         if field in candidates_df.columns:
             candidates_df[field] = candidates_df[field].apply(preprocess_text)
 
-    # Define weights for scoring
-    weights = {
-        "Skills": 0.3,
-        "Job Title": 0.2,
-        "Experience": 0.2,
-        "Location": 0.1,
-        "Certifications": 0.05,
-        "Education": 0.05,
-        "Past Job Titles": 0.1
-    }
-
-    # Initialize scores
+def init_scores(candidates_df):
+    """Add the score columns, set to zero, in place."""
     candidates_df["skills_score"] = 0.0
     candidates_df["job_title_score"] = 0.0
     candidates_df["experience_score"] = 0.0
@@ -65,30 +210,324 @@ def ranker_sort(job_description_file, candidate_csv_file, output_csv_file):
     candidates_df["past_job_titles_score"] = 0.0
     candidates_df["total_score"] = 0.0
 
-    # Compute scores for each field
-    for field, weight in weights.items():
-        if field in candidates_df.columns:
-            # Generate embeddings for the candidate field
-            candidate_embeddings = candidates_df[field].apply(get_embedding).tolist()
+def embed_candidate_fields(candidates_df, extra_texts=(), batch_size=64, cache=None):
+    """
+    Embed every scored field of every (preprocessed) candidate, plus some extra
+    texts such as the job description, in one batched call.
 
-            # Compute cosine similarity between job description and candidate field embeddings
-            similarities = [cosine_similarity([job_desc_embedding], [emb])[0][0] for emb in candidate_embeddings]
-            candidates_df[f"{field.lower().replace(' ', '_')}_score"] = similarities
+    :return: Normalized embeddings of the extra texts, the scored fields, and
+        the normalized field embeddings with shape (fields, candidates, dimensions)
+    """
+    scored_fields = [field for field in WEIGHTS if field in candidates_df.columns]
+    texts = list(extra_texts)
+    for field in scored_fields:
+        texts.extend(candidates_df[field].tolist())
+    embeddings = normalize_rows(get_embeddings(texts, batch_size=batch_size, cache=cache))
 
-    # Compute total score
-    for field, weight in weights.items():
-        if field in candidates_df.columns:
-            candidates_df["total_score"] += candidates_df[f"{field.lower().replace(' ', '_')}_score"] * weight
+    extra_embeddings = embeddings[:len(extra_texts)]
+    field_embeddings = embeddings[len(extra_texts):].reshape(
+        len(scored_fields), len(candidates_df), embeddings.shape[1]
+    )
+    return extra_embeddings, scored_fields, field_embeddings
 
-    # Sort candidates by total score
-    ranked_candidates = candidates_df.sort_values(by="total_score", ascending=False)
+def score_candidates(job_description, candidates_df, batch_size=64, cache=None, pooling="max", jd_sections=None):
+    """
+    Score the (preprocessed) candidates against a job description with the model.
+
+    The job description is split into chunks (see job_description_chunks), unless
+    `pooling` is None, in which case it is embedded as one, truncated, text.
+
+    :return: The scored fields, the field scores with shape (fields, candidates),
+        and the weighted total score of each candidate
+    """
+    jd_texts = [job_description] if pooling is None else job_description_chunks(job_description, jd_sections)
+
+    # Generate the job description chunks and every candidate field embedding in a few batched calls
+    jd_embeddings, scored_fields, field_embeddings = embed_candidate_fields(
+        candidates_df, jd_texts, batch_size=batch_size, cache=cache
+    )
+
+    # Cosine similarity of every candidate field with the job description, as
+    # matrix products: row f of field_scores holds the scores of field f
+    if pooling is None:
+        field_scores = field_embeddings @ jd_embeddings[0]
+    else:
+        field_scores = pool_scores(field_embeddings, jd_embeddings, pooling)
+
+    # Compute total score as the weighted sum of the field scores
+    weight_vector = np.array([WEIGHTS[field] for field in scored_fields])
+    return scored_fields, field_scores, weight_vector @ field_scores
+
+def lexical_scores(job_description, candidates_df):
+    """
+    Cheap TF-IDF score of the (preprocessed) candidates against a job description.
+
+    Each field is scored by the cosine similarity of its TF-IDF vector with the
+    job description's, over a vocabulary fitted on the job description and all
+    the fields, and the field scores are weighted like the model scores.
+    """
+    scored_fields = [field for field in WEIGHTS if field in candidates_df.columns]
+    if not scored_fields or candidates_df.empty:
+        return np.zeros(len(candidates_df))
+
+    # Imported here as only the optional prefilter needs scikit-learn
+    from sklearn.feature_extraction.text import TfidfVectorizer
+
+    job_description = preprocess_text(job_description)
+    field_texts = [candidates_df[field].tolist() for field in scored_fields]
+    vectorizer = TfidfVectorizer(stop_words="english", sublinear_tf=True)
+    try:
+        vectorizer.fit([job_description] + [text for texts in field_texts for text in texts])
+    except ValueError:
+        # Nothing but stop words and empty fields
+        return np.zeros(len(candidates_df))
+
+    # TF-IDF rows are L2-normalized, so dot products are cosine similarities
+    job_desc_vector = vectorizer.transform([job_description]).T
+    totals = np.zeros(len(candidates_df))
+    for field, texts in zip(scored_fields, field_texts):
+        totals += WEIGHTS[field] * (vectorizer.transform(texts) @ job_desc_vector).toarray().ravel()
+    return totals
+
+def ranker_sort(job_description_file, candidate_csv_file, output_csv_file, batch_size=64, use_cache=True,
+                prefilter_top_m=None, recall_at=None, pooling="max", jd_sections=None):
+    """
+    Rank the candidates of a CSV file against a job description file.
+
+    Candidate fields are scored against chunks of the job description, pooled
+    with `pooling` ("max", "mean", or None to embed it as a single text).
+    `jd_sections` gives the chunks' sections instead of splitting the file,
+    e.g. the output of messageAgent.parse_job_description.
+
+    With `prefilter_top_m`, candidates are first scored with TF-IDF and only the
+    best `prefilter_top_m` are scored with the model. The others keep zero scores
+    and follow them in the output, by TF-IDF score. With `recall_at`, every
+    candidate is also scored with the model, to report the share of the full
+    ranking's top `recall_at` that survived the prefilter.
+
+    :return: Prefilter report, or None without a prefilter
+    """
+    # Load job description
+    with open(job_description_file, "r", encoding="utf-8") as f:
+        job_description = f.read()
+
+    # Load candidate data
+    candidates_df = pd.read_csv(candidate_csv_file)
+
+    # Preprocess candidate fields
+    preprocess_candidates(candidates_df)
+
+    # Initialize scores
+    init_scores(candidates_df)
+
+    # Stage 1 (optional): keep the best candidates by TF-IDF score
+    survivors = np.arange(len(candidates_df))
+    if prefilter_top_m is not None and prefilter_top_m < len(candidates_df):
+        candidates_df["lexical_score"] = lexical_scores(job_description, candidates_df)
+        survivors = np.argsort(-candidates_df["lexical_score"].to_numpy(), kind="stable")[:prefilter_top_m]
+
+    # Stage 2: score the survivors with the model
+    cache = get_embedding_cache() if use_cache else None
+    scored_fields, field_scores, total_scores = score_candidates(
+        job_description, candidates_df.iloc[survivors], batch_size=batch_size, cache=cache,
+        pooling=pooling, jd_sections=jd_sections
+    )
+    for field, scores in zip(scored_fields, field_scores):
+        candidates_df.iloc[survivors, candidates_df.columns.get_loc(score_column(field))] = scores
+    candidates_df.iloc[survivors, candidates_df.columns.get_loc("total_score")] = total_scores
+
+    # Sort candidates by total score, the ones filtered out go last
+    ranked_candidates = candidates_df.iloc[survivors].sort_values(by="total_score", ascending=False)
+    if len(survivors) < len(candidates_df):
+        filtered_out = candidates_df.drop(index=candidates_df.index[survivors]).sort_values(
+            by="lexical_score", ascending=False, kind="stable"
+        )
+        ranked_candidates = pd.concat([ranked_candidates, filtered_out])
 
     # Save the ranked candidates to a new CSV file
     ranked_candidates.to_csv(output_csv_file, index=False)
 
+    if len(survivors) == len(candidates_df):
+        return None
+    report = {"candidates": len(candidates_df), "survivors": len(survivors)}
+    if recall_at:
+        # Full ranking with the model, to check the prefilter is safe
+        _, _, full_scores = score_candidates(job_description, candidates_df, batch_size=batch_size, cache=cache,
+                                             pooling=pooling, jd_sections=jd_sections)
+        top = np.argsort(-full_scores, kind="stable")[:recall_at]
+        report["recall_at"] = len(top)
+        report["recall"] = len(np.intersect1d(top, survivors)) / len(top)
+        print(f"Prefilter recall@{len(top)}: {report['recall']:.2%} "
+              f"({len(survivors)} of {len(candidates_df)} candidates embedded)")
+    return report
+
+def job_description_hash(job_description, pooling="max", jd_sections=None):
+    """Hash of everything the scores of a job description depend on, including the model."""
+    key = json.dumps([MODEL_NAME, ENCODER_BACKEND, pooling, jd_sections, job_description], sort_keys=True)
+    return hashlib.sha256(key.encode("utf-8")).hexdigest()
+
+def candidate_row_hash(candidate):
+    """Hash of the (preprocessed) fields a candidate is scored on."""
+    key = json.dumps([candidate.get(field, "") for field in WEIGHTS])
+    return hashlib.sha256(key.encode("utf-8")).hexdigest()
+
+def ranker_sort_incremental(job_description_file, candidate_csv_file, output_csv_file, batch_size=64,
+                            use_cache=True, pooling="max", jd_sections=None, store=None):
+    """
+    Rank the candidates of a CSV file, scoring only the candidates that are new or
+    changed since a previous ranking against the same job description.
+
+    Scores are kept in `store` (a ScoreStore) by job description hash and
+    `urn id`. A changed job description, model or pooling gives a new hash, so
+    every candidate is scored again, and the scores of the previous hash of
+    the job description file are dropped. Scores are the same as ranker_sort's.
+
+    :return: Number of candidates scored and of candidates whose scores were reused
+    """
+    with open(job_description_file, "r", encoding="utf-8") as f:
+        job_description = f.read()
+
+    candidates_df = pd.read_csv(candidate_csv_file)
+    preprocess_candidates(candidates_df)
+    init_scores(candidates_df)
+    score_columns = [column for column in candidates_df.columns if column.endswith("_score")]
+
+    # Find the candidates whose stored scores are still valid
+    store = store or ScoreStore()
+    jd_hash = job_description_hash(job_description, pooling, jd_sections)
+    store.use_job_description(job_description_file, jd_hash)
+    urn_ids = candidates_df["urn id"].astype(str).tolist()
+    row_hashes = [candidate_row_hash(candidate) for candidate in candidates_df.to_dict(orient="records")]
+    stored = store.get_many(jd_hash, set(urn_ids))
+    reused = [i for i, (urn_id, row_hash) in enumerate(zip(urn_ids, row_hashes))
+              if urn_id in stored and stored[urn_id][0] == row_hash]
+    stale = np.setdiff1d(np.arange(len(candidates_df)), reused)
+
+    for i in reused:
+        for column, score in stored[urn_ids[i]][1].items():
+            candidates_df.iloc[i, candidates_df.columns.get_loc(column)] = score
+
+    # Score the new and changed candidates only, then store their scores
+    if len(stale):
+        cache = get_embedding_cache() if use_cache else None
+        scored_fields, field_scores, total_scores = score_candidates(
+            job_description, candidates_df.iloc[stale], batch_size=batch_size, cache=cache,
+            pooling=pooling, jd_sections=jd_sections
+        )
+        for field, scores in zip(scored_fields, field_scores):
+            candidates_df.iloc[stale, candidates_df.columns.get_loc(score_column(field))] = scores
+        candidates_df.iloc[stale, candidates_df.columns.get_loc("total_score")] = total_scores
+
+        store.put_many(jd_hash, [
+            (urn_ids[i], row_hashes[i], candidates_df.iloc[i][score_columns].astype(float).to_dict())
+            for i in stale
+        ])
+
+    # Sort candidates by total score and save them
+    ranked_candidates = candidates_df.sort_values(by="total_score", ascending=False)
+    ranked_candidates.to_csv(output_csv_file, index=False)
+    return {"scored": len(stale), "reused": len(reused)}
+
+def _init_shard_worker(backend):
+    """
+    Process pool initializer: load the model once per worker, on a single
+    thread, as the workers already use every core between them.
+    """
+    use_backend(backend, num_threads=1)
+    warm_model()
+
+def _rank_shard(job_description, shard_df, shard_file, batch_size, pooling, jd_sections, top_k=None):
+    """Score one shard of candidates in a worker and save its best `top_k` sorted by total score."""
+    preprocess_candidates(shard_df)
+    init_scores(shard_df)
+    # No embedding cache: workers would write the same cache files concurrently
+    scored_fields, field_scores, total_scores = score_candidates(
+        job_description, shard_df, batch_size=batch_size, pooling=pooling, jd_sections=jd_sections
+    )
+    for field, scores in zip(scored_fields, field_scores):
+        shard_df[score_column(field)] = scores
+    shard_df["total_score"] = total_scores
+    shard_df = shard_df.sort_values(by="total_score", ascending=False)
+    if top_k is not None:
+        shard_df = shard_df.head(top_k)
+    shard_df.to_csv(shard_file, index=False)
+    return shard_file
+
+# Number of sorted files merged at once, well under the usual limit of open files
+MERGE_FAN_IN = 64
+
+def _merge_sorted_csvs(input_files, output_file, top_k=None):
+    """Merge CSV files sorted by total score into one, keeping only the best `top_k` rows if given."""
+    inputs = [open(input_file, "r", newline="", encoding="utf-8") for input_file in input_files]
+    try:
+        readers = [csv.reader(f) for f in inputs]
+        headers = [next(reader) for reader in readers]
+        with open(output_file, "w", newline="", encoding="utf-8") as output:
+            writer = csv.writer(output)
+            if not headers:
+                return
+            writer.writerow(headers[0])
+            score_index = headers[0].index("total_score")
+            merged = heapq.merge(*readers, key=lambda row: -float(row[score_index]))
+            writer.writerows(itertools.islice(merged, top_k))
+    finally:
+        for f in inputs:
+            f.close()
+
+def ranker_sort_sharded(job_description_file, candidate_csv_file, output_csv_file, chunksize=5000,
+                        max_workers=None, top_k=None, batch_size=64, pooling="max", jd_sections=None):
+    """
+    Rank a candidate CSV file too large to score in one process.
+
+    The file is read in shards of `chunksize` rows, each shard is scored and
+    sorted by a pool of `max_workers` processes, each loading the model once,
+    and the sorted shards are merged into `output_csv_file`, keeping only the
+    best `top_k` candidates if given. At most two shards per worker are in
+    flight, and the merge streams rows, so memory does not grow with the file.
+    Shards are merged `MERGE_FAN_IN` files at a time, in as many passes as
+    needed, so the number of open files does not grow with it either. With
+    `top_k`, each shard and intermediate merge keeps only its best `top_k`.
+    Scores are the same as ranker_sort's.
+    """
+    with open(job_description_file, "r", encoding="utf-8") as f:
+        job_description = f.read()
+
+    max_workers = max_workers or os.cpu_count() or 1
+    output_dir = os.path.dirname(os.path.abspath(output_csv_file))
+    # Spawned rather than forked, as a forked copy of a loaded model or its thread pools can deadlock
+    with tempfile.TemporaryDirectory(dir=output_dir) as shard_dir, \
+            ProcessPoolExecutor(max_workers=max_workers, mp_context=multiprocessing.get_context("spawn"),
+                                initializer=_init_shard_worker, initargs=(ENCODER_BACKEND,)) as executor:
+        # Step 1: Score and sort the shards, with a bounded number in flight
+        shard_files, pending = [], set()
+        for i, shard_df in enumerate(pd.read_csv(candidate_csv_file, chunksize=chunksize)):
+            if len(pending) >= 2 * max_workers:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                shard_files.extend(future.result() for future in done)
+            shard_file = os.path.join(shard_dir, f"shard_{i:05d}.csv")
+            pending.add(executor.submit(_rank_shard, job_description, shard_df, shard_file,
+                                        batch_size, pooling, jd_sections, top_k))
+        shard_files.extend(future.result() for future in pending)
+
+        # Step 2: Merge the sorted shards by total score, at most MERGE_FAN_IN files at a time
+        shard_files = sorted(shard_files)
+        merge_pass = 0
+        while len(shard_files) > MERGE_FAN_IN:
+            merged_files = []
+            for start in range(0, len(shard_files), MERGE_FAN_IN):
+                group = shard_files[start:start + MERGE_FAN_IN]
+                merged_file = os.path.join(shard_dir, f"merge_{merge_pass}_{start // MERGE_FAN_IN:05d}.csv")
+                _merge_sorted_csvs(group, merged_file, top_k)
+                for shard_file in group:
+                    os.remove(shard_file)
+                merged_files.append(merged_file)
+            shard_files, merge_pass = merged_files, merge_pass + 1
+        _merge_sorted_csvs(shard_files, output_csv_file, top_k)
+
 # Example usage
-ranker_sort(
-    job_description_file="Google_Software Engineer.md",
-    candidate_csv_file="candidates.csv",
-    output_csv_file="ranked_candidates.csv"
-)
+if __name__ == "__main__":
+    ranker_sort(
+        job_description_file="Google_Software Engineer.md",
+        candidate_csv_file="candidates.csv",
+        output_csv_file="ranked_candidates.csv"
+    )
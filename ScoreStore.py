@@ -0,0 +1,83 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+
+class ScoreStore:
+    """
+    Persistent store of candidate scores, backed by SQLite.
+
+    Scores are keyed by the hash of the job description they were computed
+    against and the candidate's `urn id`, and carry a hash of the candidate
+    fields they were computed from, so a changed job description or candidate
+    is scored again. The store also tracks the current hash of each job
+    description file, and drops the scores of hashes no file has anymore, so
+    it grows with the job descriptions in use rather than with every edit.
+
+    :param path: Path of the SQLite database
+    """
+
+    def __init__(self, path=".ranker_scores.sqlite"):
+        self.path = path
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute(
+            """
+            CREATE TABLE IF NOT EXISTS scores (
+                jd_hash TEXT NOT NULL,
+                urn_id TEXT NOT NULL,
+                row_hash TEXT NOT NULL,
+                scores TEXT NOT NULL,
+                updated_at REAL NOT NULL,
+                PRIMARY KEY (jd_hash, urn_id)
+            )
+            """
+        )
+        self._db.execute(
+            """
+            CREATE TABLE IF NOT EXISTS jd_files (
+                jd_file TEXT PRIMARY KEY,
+                jd_hash TEXT NOT NULL
+            )
+            """
+        )
+        self._db.commit()
+
+    def get_many(self, jd_hash, urn_ids):
+        """Return {urn id: (row hash, scores)} for the stored candidates."""
+        found = {}
+        urn_ids = list(urn_ids)
+        with self._lock:
+            # Stay under SQLite's limit on the number of query parameters
+            for start in range(0, len(urn_ids), 500):
+                batch = urn_ids[start:start + 500]
+                rows = self._db.execute(
+                    f"SELECT urn_id, row_hash, scores FROM scores WHERE jd_hash = ? "
+                    f"AND urn_id IN ({', '.join('?' * len(batch))})",
+                    [jd_hash] + batch,
+                ).fetchall()
+                for urn_id, row_hash, scores in rows:
+                    found[urn_id] = (row_hash, json.loads(scores))
+        return found
+
+    def put_many(self, jd_hash, entries):
+        """Store (urn id, row hash, scores) entries for a job description."""
+        now = time.time()
+        with self._lock:
+            self._db.executemany(
+                "REPLACE INTO scores VALUES (?, ?, ?, ?, ?)",
+                [(jd_hash, urn_id, row_hash, json.dumps(scores), now)
+                 for urn_id, row_hash, scores in entries],
+            )
+            self._db.commit()
+
+    def use_job_description(self, jd_file, jd_hash):
+        """
+        Record the current hash of a job description file, and remove the
+        scores of the hashes no job description file has anymore.
+        """
+        with self._lock:
+            self._db.execute("REPLACE INTO jd_files VALUES (?, ?)", (os.path.abspath(jd_file), jd_hash))
+            self._db.execute("DELETE FROM scores WHERE jd_hash NOT IN (SELECT jd_hash FROM jd_files)")
+            self._db.commit()
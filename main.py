@@ -1,10 +1,13 @@
 import streamlit as st
 import pandas as pd
 import os
+import threading
 from dotenv import load_dotenv
-from JobDescriptionBuilder import run_graph  # Generates the JD file
-from Employeegather import gather_people_csv  # Generates the candidate CSV
-from Ranker import ranker_sort  # Generates the ranked CSV
+from JobDescriptionBuilder import stream_graph  # Generates the JD file
+from Employeegather import gather_people_csv, candidates_csv_path, is_gather_complete, sanitize_filename  # Generates the candidate CSV
+from Ranker import ranker_sort_incremental, warm_model  # Generates the ranked CSV
+from CandidateIndex import get_candidate_index  # Cross-role candidate search
+from LinkedinProvider import POOL_SIZE, get_linkedin  # Shared LinkedIn client
 
 # Load environment variables
 load_dotenv()
@@ -12,11 +15,6 @@ GOOGLE_API_KEY = os.getenv("GOOGLE_API_KEY")
 LI_AT_VALUE = os.getenv("LI_AT_VALUE")
 JSESSIONID = os.getenv("JSESSIONID")
 
-# Function to sanitize file names
-def sanitize_filename(text):
-    """Replace spaces and special characters with underscores."""
-    return text.replace(" ", "_").replace("/", "_").replace("\\", "_").lower()
-
 # Function to display CSV data with images, links, and optional scores
 def display_csv_with_data(csv_file, show_scores=False):
     """Display CSV data with images, clickable profile links, and optionally scores."""
@@ -112,15 +110,15 @@ def main():
         jd_file = f"jd_{prefix}.md"
 
         if not os.path.exists(jd_file):
-            with st.spinner("Generating Job Description..."):
-                try:
-                    generated_file = run_graph(st.session_state.company_id, st.session_state.job_role)
-                    if generated_file != jd_file:
-                        os.rename(generated_file, jd_file)
-                    st.session_state.files.append(jd_file)
-                except Exception as e:
-                    st.error(f"Error generating job description: {e}")
-                    return
+            # Show the job description as it is generated, the file is written once it is complete
+            st.markdown("### Generated Job Description")
+            try:
+                st.write_stream(stream_graph(st.session_state.company_id, st.session_state.job_role, jd_file))
+                st.session_state.files.append(jd_file)
+            except Exception as e:
+                st.error(f"Error generating job description: {e}")
+                return
+            st.rerun()
 
         if os.path.exists(jd_file):
             with open(jd_file, "r", encoding="utf-8") as f:
@@ -134,18 +132,10 @@ def main():
         col1, col2 = st.columns(2)
         with col1:
             if st.button("Regenerate Job Description"):
+                # The job description is generated again, streamed, on the next run
                 if os.path.exists(jd_file):
                     os.remove(jd_file)
                     st.session_state.files.remove(jd_file)
-                with st.spinner("Regenerating Job Description..."):
-                    try:
-                        generated_file = run_graph(st.session_state.company_id, st.session_state.job_role)
-                        if generated_file != jd_file:
-                            os.rename(generated_file, jd_file)
-                        st.session_state.files.append(jd_file)
-                    except Exception as e:
-                        st.error(f"Error regenerating job description: {e}")
-                        return
                 st.rerun()
         with col2:
             if st.button("Accept and Proceed"):
@@ -155,18 +145,22 @@ def main():
     # Step 3: Gather People
     elif st.session_state.step == 3:
         st.header("Gathering Candidates")
-        candidate_csv = f"candidates_{sanitize_filename(st.session_state.job_role)}.csv"
+        candidate_csv = candidates_csv_path(st.session_state.job_role)
 
-        if not os.path.exists(candidate_csv):
+        # An interrupted run leaves a partial CSV; gathering again resumes it
+        if not is_gather_complete(candidate_csv):
             with st.spinner("Gathering Candidates..."):
                 try:
-                    gather_people_csv(st.session_state.job_role, st.session_state.num_search)
-                    st.session_state.files.append(candidate_csv)
+                    # One profile fetch in flight per pooled connection, paced by the shared rate limiter
+                    gather_people_csv(st.session_state.job_role, st.session_state.num_search, get_linkedin(),
+                                      max_workers=POOL_SIZE)
+                    if candidate_csv not in st.session_state.files:
+                        st.session_state.files.append(candidate_csv)
                 except Exception as e:
                     st.error(f"Error gathering candidates: {e}")
                     return
 
-        if os.path.exists(candidate_csv):
+        if is_gather_complete(candidate_csv):
             st.success(f"Candidates gathered and saved to {candidate_csv}")
             if st.button("Proceed to Review Candidates"):
                 st.session_state.step = 4
@@ -178,7 +172,11 @@ def main():
     # Step 4: Display Candidate Profiles
     elif st.session_state.step == 4:
         st.header("Review Candidates")
-        candidate_csv = f"candidates_{sanitize_filename(st.session_state.job_role)}.csv"
+        candidate_csv = candidates_csv_path(st.session_state.job_role)
+
+        # Load the ranking model in the background while candidates are reviewed
+        threading.Thread(target=warm_model, daemon=True).start()
+
         display_csv_with_data(candidate_csv)
 
         if st.button("Proceed to Ranking"):
@@ -190,18 +188,29 @@ def main():
         st.header("Ranking Candidates")
         prefix = f"{sanitize_filename(st.session_state.company_id)}_{sanitize_filename(st.session_state.job_role)}"
         jd_file = f"jd_{prefix}.md"
-        candidate_csv = f"candidates_{sanitize_filename(st.session_state.job_role)}.csv"
+        candidate_csv = candidates_csv_path(st.session_state.job_role)
         ranked_csv = f"ranked_{prefix}.csv"
 
-        if not os.path.exists(ranked_csv):
+        # Rank again when candidates were appended or the JD was edited since the last ranking;
+        # only new or changed candidates are scored
+        inputs_mtime = max((os.path.getmtime(f) for f in (candidate_csv, jd_file) if os.path.exists(f)), default=0)
+        if not os.path.exists(ranked_csv) or os.path.getmtime(ranked_csv) < inputs_mtime:
             with st.spinner("Ranking Candidates..."):
                 try:
-                    ranker_sort(jd_file, candidate_csv, ranked_csv)
-                    st.session_state.files.append(ranked_csv)
+                    ranker_sort_incremental(jd_file, candidate_csv, ranked_csv)
+                    if ranked_csv not in st.session_state.files:
+                        st.session_state.files.append(ranked_csv)
                 except Exception as e:
                     st.error(f"Error ranking candidates: {e}")
                     return
 
+                # Make the candidates searchable across roles, with the model ranking just loaded;
+                # the ranking does not depend on it, so a failure is only reported
+                try:
+                    get_candidate_index().add_csv(candidate_csv)
+                except Exception as e:
+                    st.warning(f"Candidates were not added to the cross-role index: {e}")
+
         if os.path.exists(ranked_csv):
             st.success(f"Candidates ranked and saved to {ranked_csv}")
             if st.button("View Ranked Candidates"):
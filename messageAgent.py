@@ -1,10 +1,14 @@
+import hashlib
 import pandas as pd
+import queue
+import threading
+import time
 from langchain_google_genai import ChatGoogleGenerativeAI
-from linkedin_api import Linkedin
 import os
 from dotenv import load_dotenv
-from requests.utils import cookiejar_from_dict
-from linkedin_api import Linkedin
+from LinkedinProvider import get_linkedin
+from LLMCache import get_llm_cache
+from Outbox import Outbox, FAILED, SENT
 
 # Load environment variables
 load_dotenv()
@@ -12,13 +16,6 @@ load_dotenv()
 # Initialize Gemini 2.0 Flash model using LangChain
 GOOGLE_API_KEY = os.getenv("GOOGLE_API_KEY")
 llm = ChatGoogleGenerativeAI(model="gemini-2.0-flash", google_api_key=GOOGLE_API_KEY)
-
-# Initialize LinkedIn API client
-li_at_value = os.getenv("LI_AT_VALUE")
-JSESSIONID = os.getenv("JSESSIONID")
-cookie_dict = {"li_at": li_at_value, "JSESSIONID": JSESSIONID}
-cookie_jar = cookiejar_from_dict(cookie_dict)
-api = Linkedin(username="", password="", cookies=cookie_jar)
     
     
 def parse_job_description(job_description_file):
@@ -46,11 +43,11 @@ def parse_job_description(job_description_file):
         "preferred_qualifications": preferred_qualifications
     }
 
-def generate_personalized_message(candidate_profile, job_description):
+def build_message_prompt(candidate_profile, job_description):
     """
-    Generate a personalized message for a candidate using Gemini 2.0 Flash.
+    Build the prompt of a personalized message for a candidate.
     """
-    template = f"""
+    return f"""
     You are contacting a candidate based on their LinkedIn profile and the following job description:
     - Job Title: {candidate_profile.get('job title', 'Not specified')}
     - Skills: {candidate_profile.get('skills', 'Not specified')}
@@ -65,53 +62,129 @@ def generate_personalized_message(candidate_profile, job_description):
     Highlight how the candidate's skills and experience align with the job description.
     Make sure the tone is friendly but formal.
     """
-    response = llm.invoke(template)
-    return response.content.strip()
 
-def message_people(job_description_file, ranked_csv_file, num_people):
+def generate_personalized_message(candidate_profile, job_description):
+    """
+    Generate a personalized message for a candidate using Gemini 2.0 Flash.
+    """
+    template = build_message_prompt(candidate_profile, job_description)
+    # Messaging the same candidate for the same job again reuses the cached message
+    response = get_llm_cache().invoke(llm, template)
+    return response.strip()
+
+def send_messages(api, send_queue, outbox):
+    """
+    Send the queued outbox entries until a None item, at the pace of the
+    LinkedIn client's write rate limit, recording each outcome in the outbox.
+    """
+    while True:
+        entry = send_queue.get()
+        if entry is None:
+            send_queue.task_done()
+            return
+        urn_id, name = entry["urn_id"], entry["name"]
+
+        try:
+            # Send the message via LinkedIn API, which returns True on error.
+            # The stored origin token makes a retried send a duplicate LinkedIn drops
+            error = api.send_message(
+                message_body=entry["message"],
+                recipients=[urn_id],  # Uses profile URN directly
+                origin_token=entry["origin_token"]
+            )
+            if error:
+                raise Exception("LinkedIn did not accept the message")
+
+            # Log successful messaging
+            outbox.mark_sent(urn_id, entry["jd_hash"])
+            print(f"Message sent to {name} (URN: {urn_id})")
+
+        except Exception as e:
+            outbox.mark_failed(urn_id, entry["jd_hash"], e)
+            print(f"Failed to send message to {name} (URN: {urn_id}): {e}")
+        finally:
+            send_queue.task_done()
+
+def message_people(job_description_file, ranked_csv_file, num_people, max_concurrency=8, outbox=None):
     """
     Send personalized messages to the top N candidates from the ranked CSV file based on the job description.
+
+    Messages are drafted concurrently, with at most `max_concurrency` Gemini calls
+    in flight, and each draft is queued for a sender thread as soon as it is
+    ready, so sending overlaps drafting.
+
+    Every message goes through `outbox` (an Outbox). Rerunning after a crash
+    skips the candidates already messaged for this job, sends the drafted
+    messages that were not sent yet, and failed sends are retried with backoff.
     """
     # Parse the job description
     job_description = parse_job_description(job_description_file)
+    with open(job_description_file, "rb") as f:
+        jd_hash = hashlib.sha256(f.read()).hexdigest()
     
     # Read and sort CSV by total_score (descending)
     df = pd.read_csv(ranked_csv_file)
     df_sorted = df.sort_values(by='total_score', ascending=False)
     
     # Select top N candidates
-    top_candidates = df_sorted.head(num_people)
+    top_candidates = [row for _, row in df_sorted.head(num_people).iterrows()]
+    urn_ids = [row['urn id'] for row in top_candidates]
     
-    # Track messaged candidates
-    messaged_candidates = []
-    
-    # Iterate through top candidates and send messages
-    for index, row in top_candidates.iterrows():
-        urn_id = row['urn id']
-        name = row['name']
-        
-        try:
-            # Generate personalized message using Gemini 2.0 Flash
-            personalized_message = generate_personalized_message(row, job_description)
-            
-            # Send the message via LinkedIn API
-            api.send_message(
-                message=personalized_message,
-                recipients=[urn_id]  # Uses profile URN directly
-            )
-            
-            # Log successful messaging
-            print(f"Message sent to {name} (URN: {urn_id})")
-            messaged_candidates.append({
-                "urn_id": urn_id,
-                "name": name,
-                "message": personalized_message
-            })
-        
-        except Exception as e:
-            print(f"Failed to send message to {name} (URN: {urn_id}): {e}")
+    # Shared LinkedIn client
+    api = get_linkedin()
+    outbox = outbox or Outbox()
+
+    # Send stage: one thread sending the queued messages, paced by the rate limiter
+    send_queue = queue.Queue()
+    sender = threading.Thread(target=send_messages, args=(api, send_queue, outbox))
+    sender.start()
+
+    def enqueue(entry):
+        outbox.mark_queued(entry["urn_id"], jd_hash)
+        send_queue.put(entry)
+
+    try:
+        # Resume: queue the messages already drafted for this job, skip the ones already sent
+        to_draft = []
+        for row in top_candidates:
+            entry = outbox.get(row['urn id'], jd_hash)
+            if entry is None:
+                to_draft.append(row)
+            elif entry["state"] == SENT:
+                print(f"Already messaged {row['name']} (URN: {row['urn id']})")
+            elif outbox.is_sendable(entry) and entry["next_attempt_at"] <= time.time():
+                enqueue(entry)
+
+        # Generation stage: draft the other messages concurrently, cached ones come first
+        prompts = [build_message_prompt(row, job_description) for row in to_draft]
+        for index, message in get_llm_cache().batch_as_completed(llm, prompts, max_concurrency=max_concurrency):
+            row = to_draft[index]
+            if isinstance(message, Exception):
+                print(f"Failed to draft a message for {row['name']} (URN: {row['urn id']}): {message}")
+                continue
+            enqueue(outbox.draft(row['urn id'], jd_hash, row['name'], message.strip()))
+        send_queue.join()
+
+        # Retry the failed sends once their backoff has elapsed
+        while True:
+            retries = [entry for entry in outbox.entries(jd_hash, urn_ids)
+                       if entry["state"] == FAILED and outbox.is_sendable(entry)]
+            if not retries:
+                break
+            time.sleep(max(0, min(entry["next_attempt_at"] for entry in retries) - time.time()))
+            for entry in retries:
+                if entry["next_attempt_at"] <= time.time():
+                    enqueue(entry)
+            send_queue.join()
+    finally:
+        send_queue.put(None)
+        sender.join()
     
-    # Save messaged candidates to a new CSV file
+    # Save messaged candidates to a new CSV file, in ranking order
+    messaged_candidates = [
+        {"urn_id": entry["urn_id"], "name": entry["name"], "message": entry["message"]}
+        for entry in outbox.entries(jd_hash, urn_ids) if entry["state"] == SENT
+    ]
     messaged_df = pd.DataFrame(messaged_candidates)
     output_file = f"messaged_{ranked_csv_file}"
     messaged_df.to_csv(output_file, index=False)
@@ -0,0 +1,32 @@
+import hashlib
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import Ranker
+
+
+class FakeEncoder:
+    """Deterministic bag-of-words encoder, so the ranker can be tested without a model."""
+
+    dim = 16
+
+    def encode(self, texts, batch_size=32):
+        vectors = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for i, text in enumerate(texts):
+            for word in text.split():
+                vectors[i, int(hashlib.md5(word.encode()).hexdigest(), 16) % self.dim] += 1
+        return vectors
+
+
+@pytest.fixture
+def fake_model(tmp_path, monkeypatch):
+    """Rank with FakeEncoder, in a temporary working directory holding the caches."""
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(Ranker, "_model", FakeEncoder())
+    monkeypatch.setattr(Ranker, "_embedding_cache", None)
+    return FakeEncoder
@@ -0,0 +1,41 @@
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from CandidateIndex import CandidateIndex
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+
+def test_query_ignores_an_interrupted_insert(fake_model, tmp_path):
+    job_description = os.path.join(FIXTURES, "job_description.md")
+
+    index = CandidateIndex()
+    assert index.add_csv(os.path.join(FIXTURES, "candidates.csv")) > 0
+    expected = index.query_file(job_description, k=3)
+
+    # A crash after writing the vectors of the next insert, in the middle of its rows
+    with open(index.vectors_path, "ab") as f:
+        f.write(np.ones((5, fake_model.dim), dtype=np.float32).tobytes())
+    with open(index.rows_path, "a", encoding="utf-8") as f:
+        f.write('{"urn id": "ACoAA999", "na')
+
+    reopened = CandidateIndex()
+    assert len(reopened) == len(index)
+    results = reopened.query_file(job_description, k=3)
+    pd.testing.assert_frame_equal(results, expected)
+
+    # The next insert drops what the interrupted one left
+    extra = tmp_path / "extra.csv"
+    pd.read_csv(os.path.join(FIXTURES, "candidates.csv")).head(1).assign(**{"urn id": "ACoAA999"}).to_csv(
+        extra, index=False
+    )
+    assert reopened.add_csv(str(extra)) == 1
+    reopened = CandidateIndex()
+    assert len(reopened) == len(index) + 1
+    assert os.path.getsize(reopened.vectors_path) == len(reopened) * fake_model.dim * 4
+    assert reopened.query_file(job_description, k=len(reopened))["urn id"].nunique() == len(reopened)
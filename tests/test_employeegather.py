@@ -0,0 +1,88 @@
+import csv
+import os
+import sys
+
+import pytest
+
+pytest.importorskip("dotenv")
+pytest.importorskip("linkedin_api")
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from Employeegather import candidates_csv_path, gather_people_csv, is_gather_complete, journal_path
+
+PEOPLE = [{"urn_id": f"urn{i}", "name": f"Candidate {i}", "jobtitle": "Engineer", "location": "Remote"}
+          for i in range(6)]
+
+
+class FakeApi:
+    def __init__(self, fail_after=None, failing_profiles=()):
+        self.fail_after = fail_after
+        self.failing_profiles = set(failing_profiles)
+        self.fetched = []
+
+    def iter_search_people(self, keywords, limit):
+        for i, person in enumerate(PEOPLE[:limit]):
+            if i == self.fail_after:
+                raise RuntimeError("search failed")
+            yield person
+
+    def get_profile(self, urn_id):
+        self.fetched.append(urn_id)
+        if urn_id in self.failing_profiles:
+            # Like Linkedin.get_profile on a 429 or with expired cookies
+            raise Exception("Request failed: get_profile")
+        return {"skills": [{"name": f"skill of {urn_id}"}]}
+
+
+def read_urn_ids(csv_file):
+    with open(csv_file, newline="", encoding="utf-8") as f:
+        return [row["urn id"] for row in csv.DictReader(f)]
+
+
+def test_gather_resumes_after_a_failed_search(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    csv_file = candidates_csv_path("UI/UX Designer")
+
+    api = FakeApi(fail_after=3)
+    with pytest.raises(RuntimeError):
+        gather_people_csv("UI/UX Designer", 6, api=api, max_workers=2)
+    assert not is_gather_complete(csv_file)
+    assert sorted(read_urn_ids(csv_file)) == ["urn0", "urn1", "urn2"]
+
+    # A row written after the last journal entry of the crashed run is dropped
+    with open(csv_file, "a", newline="", encoding="utf-8") as f:
+        csv.writer(f).writerow(["urn9"] + ["N/A"] * 10)
+
+    api = FakeApi()
+    assert gather_people_csv("UI/UX Designer", 6, api=api, max_workers=2) == csv_file
+    assert sorted(api.fetched) == ["urn3", "urn4", "urn5"]
+    assert is_gather_complete(csv_file)
+    # Rows are back in search order, each candidate once
+    assert read_urn_ids(csv_file) == [person["urn_id"] for person in PEOPLE]
+
+    # A complete gather is not fetched again
+    api = FakeApi()
+    gather_people_csv("UI/UX Designer", 6, api=api)
+    assert api.fetched == []
+    assert os.path.exists(journal_path(csv_file))
+
+
+def test_failed_profile_is_fetched_again(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    csv_file = candidates_csv_path("Backend Engineer")
+
+    api = FakeApi(failing_profiles={"urn2"})
+    with pytest.raises(Exception, match="could not be fetched"):
+        gather_people_csv("Backend Engineer", 6, api=api, max_workers=2)
+    # The other rows are kept, the failed one is neither written nor marked done
+    assert read_urn_ids(csv_file) == ["urn0", "urn1", "urn3", "urn4", "urn5"]
+    assert not is_gather_complete(csv_file)
+
+    api = FakeApi()
+    gather_people_csv("Backend Engineer", 6, api=api, max_workers=2)
+    assert api.fetched == ["urn2"]
+    assert is_gather_complete(csv_file)
+    assert read_urn_ids(csv_file) == [person["urn_id"] for person in PEOPLE]
+    with open(csv_file, newline="", encoding="utf-8") as f:
+        assert next(row for row in csv.DictReader(f) if row["urn id"] == "urn2")["skills"] == "skill of urn2"
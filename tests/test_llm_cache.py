@@ -0,0 +1,132 @@
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from LLMCache import LLMCache
+
+
+class FakeMessage:
+    def __init__(self, content, tokens):
+        self.content = content
+        self.usage_metadata = {"total_tokens": tokens}
+
+
+class FakeLLM:
+    """Chat model answering "answer to <prompt>", failing on prompts containing FAIL."""
+
+    def __init__(self, model="fake"):
+        self.model = model
+        self.prompts = []
+
+    def answer(self, prompt):
+        self.prompts.append(prompt)
+        if "FAIL" in prompt:
+            return RuntimeError("model error")
+        return FakeMessage(f"answer to {prompt}", tokens=len(prompt))
+
+    def invoke(self, prompt):
+        return self.answer(prompt)
+
+    def batch_as_completed(self, prompts, config=None, return_exceptions=False):
+        for i, prompt in reversed(list(enumerate(prompts))):
+            yield i, self.answer(prompt)
+
+
+class FakeEmbed:
+    """Embeds a prompt by its leading word, so prompts sharing it are near-duplicates."""
+
+    VECTORS = {"alpha": [1.0, 0.0], "alpha2": [0.95, 0.05], "beta": [0.0, 1.0], "gamma": [0.6, -0.8]}
+
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, prompts):
+        self.calls.append(list(prompts))
+        return np.array([self.VECTORS[prompt.split()[0]] for prompt in prompts])
+
+
+@pytest.fixture
+def cache_path(tmp_path):
+    return str(tmp_path / "llm.sqlite")
+
+
+def test_exact_hit_after_whitespace_normalization(cache_path):
+    cache, llm = LLMCache(path=cache_path), FakeLLM()
+    first = cache.invoke(llm, "  Write a message\n\n    for Alex ")
+    again = LLMCache(path=cache_path).invoke(llm, "Write a message for Alex")
+
+    assert again == first
+    assert len(llm.prompts) == 1
+    # Another model does not share the response
+    cache.invoke(FakeLLM(model="other"), "Write a message for Alex")
+    assert cache.stats["entries"] == 2
+
+
+def test_responses_expire_after_ttl(cache_path, monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr("LLMCache.time.time", lambda: now[0])
+    cache, llm = LLMCache(path=cache_path, ttl=60), FakeLLM()
+
+    cache.invoke(llm, "prompt")
+    now[0] += 59
+    cache.invoke(llm, "prompt")
+    assert len(llm.prompts) == 1
+
+    now[0] += 2
+    cache.invoke(llm, "prompt")
+    assert len(llm.prompts) == 2
+
+
+def test_near_duplicates_above_the_threshold_are_hits(cache_path):
+    embed = FakeEmbed()
+    cache, llm = LLMCache(path=cache_path, similarity_threshold=0.99, embed=embed), FakeLLM()
+
+    cached = cache.invoke(llm, "alpha first")
+    # cos(alpha, alpha2) is about 0.9986, cos(alpha, beta) is 0
+    assert cache.invoke(llm, "alpha2 second") == cached
+    assert cache.invoke(llm, "beta third") == "answer to beta third"
+    assert llm.prompts == ["alpha first", "beta third"]
+
+    # Exact hits are not embedded
+    calls = len(embed.calls)
+    cache.invoke(llm, "alpha first")
+    assert len(embed.calls) == calls
+
+    # Above the similarity of alpha and alpha2, they are different prompts
+    strict = LLMCache(path=cache_path, similarity_threshold=0.999, embed=embed)
+    assert strict.invoke(llm, "alpha2 fourth") == "answer to alpha2 fourth"
+
+
+def test_saved_tokens_count_the_tokens_of_hits(cache_path):
+    cache, llm = LLMCache(path=cache_path), FakeLLM()
+    cache.invoke(llm, "twelve chars")
+    cache.invoke(llm, "twelve chars")
+    cache.invoke(llm, "twelve  chars")
+    cache.invoke(llm, "other")
+
+    assert cache.stats == {"hits": 2, "misses": 2, "saved_tokens": 24, "entries": 2}
+
+
+def test_batch_yields_errors_without_caching_them(cache_path):
+    embed = FakeEmbed()
+    cache = LLMCache(path=cache_path, similarity_threshold=0.99, embed=embed)
+    llm = FakeLLM()
+    cache.invoke(llm, "alpha cached")
+
+    prompts = ["alpha cached", "beta new", "gamma FAIL"]
+    results = dict(cache.batch_as_completed(llm, prompts))
+    assert results[0] == "answer to alpha cached"
+    assert results[1] == "answer to beta new"
+    assert isinstance(results[2], RuntimeError)
+    # The prompts without an exact match are embedded in one call
+    assert embed.calls[-1] == ["beta new", "gamma FAIL"]
+
+    llm.prompts.clear()
+    results = dict(cache.batch_as_completed(llm, ["beta new", "gamma FAIL"]))
+    assert llm.prompts == ["gamma FAIL"]
+    assert isinstance(results[1], RuntimeError)
+    assert cache.stats["entries"] == 2
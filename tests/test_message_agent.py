@@ -0,0 +1,112 @@
+import os
+import sys
+
+import pandas as pd
+import pytest
+
+pytest.importorskip("dotenv")
+pytest.importorskip("langchain_google_genai")
+pytest.importorskip("linkedin_api")
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# The Gemini client is built at import, the tests replace it before any call
+os.environ.setdefault("GOOGLE_API_KEY", "test")
+
+import messageAgent
+from LLMCache import LLMCache
+from Outbox import FAILED, QUEUED, SENT, Outbox
+
+CANDIDATES = [
+    {"urn id": f"urn{i}", "name": f"Candidate {i}", "job title": f"Engineer {i}",
+     "skills": "Python", "location": "Remote", "total_score": 1 - i / 10}
+    for i in range(4)
+]
+
+
+class FakeMessage:
+    def __init__(self, content):
+        self.content = content
+        self.usage_metadata = {"total_tokens": 10}
+
+
+class FakeLLM:
+    model = "fake"
+
+    def __init__(self):
+        self.prompts = []
+
+    def batch_as_completed(self, prompts, config=None, return_exceptions=False):
+        self.prompts.extend(prompts)
+        for i, prompt in enumerate(prompts):
+            yield i, FakeMessage("Hello " + prompt.split("Job Title: ")[1].split("\n")[0])
+
+
+class FakeApi:
+    def __init__(self, fail=False):
+        self.fail = fail
+        self.sent = []
+
+    def send_message(self, message_body, recipients, origin_token):
+        self.sent.append((recipients[0], origin_token))
+        # Like Linkedin.send_message, True means an error
+        return self.fail
+
+
+@pytest.fixture
+def job(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    with open("job.md", "w", encoding="utf-8") as f:
+        f.write("Responsibilities: Build things\nQualifications: Python\n")
+    pd.DataFrame(CANDIDATES).to_csv("ranked.csv", index=False)
+
+    llm, api = FakeLLM(), FakeApi()
+    monkeypatch.setattr(messageAgent, "llm", llm)
+    monkeypatch.setattr(messageAgent, "get_linkedin", lambda: api)
+    monkeypatch.setattr(messageAgent, "get_llm_cache", lambda: LLMCache(path=str(tmp_path / "llm.sqlite")))
+    with open("job.md", "rb") as f:
+        jd_hash = messageAgent.hashlib.sha256(f.read()).hexdigest()
+    return llm, api, jd_hash
+
+
+def test_resume_sends_pending_messages_with_their_origin_token(job, tmp_path):
+    llm, api, jd_hash = job
+    outbox = Outbox(path=str(tmp_path / "outbox.sqlite"))
+    # State left by a crashed run: one drafted, one queued, one sent
+    drafted = outbox.draft("urn0", jd_hash, "Candidate 0", "Hello 0")
+    queued = outbox.draft("urn1", jd_hash, "Candidate 1", "Hello 1")
+    outbox.mark_queued("urn1", jd_hash)
+    outbox.draft("urn2", jd_hash, "Candidate 2", "Hello 2")
+    outbox.mark_sent("urn2", jd_hash)
+
+    output_file = messageAgent.message_people("job.md", "ranked.csv", 4, outbox=outbox)
+
+    sent = dict(api.sent)
+    assert sorted(sent) == ["urn0", "urn1", "urn3"]
+    assert sent["urn0"] == drafted["origin_token"]
+    assert sent["urn1"] == queued["origin_token"]
+    # Only the candidate without a draft is drafted
+    assert len(llm.prompts) == 1 and "Engineer 3" in llm.prompts[0]
+    assert all(entry["state"] == SENT for entry in outbox.entries(jd_hash, [c["urn id"] for c in CANDIDATES]))
+    assert list(pd.read_csv(output_file)["urn_id"]) == ["urn0", "urn1", "urn2", "urn3"]
+
+
+def test_failed_sends_stop_after_max_attempts(job, tmp_path):
+    _, api, jd_hash = job
+    api.fail = True
+    outbox = Outbox(path=str(tmp_path / "outbox.sqlite"), max_attempts=2, backoff=0)
+
+    messageAgent.message_people("job.md", "ranked.csv", 2, outbox=outbox)
+
+    assert sorted(urn_id for urn_id, _ in api.sent) == ["urn0", "urn0", "urn1", "urn1"]
+    for urn_id in ["urn0", "urn1"]:
+        entry = outbox.get(urn_id, jd_hash)
+        assert entry["state"] == FAILED
+        assert entry["attempts"] == 2
+        # Retries reuse the origin token of the first attempt
+        assert {token for sent_to, token in api.sent if sent_to == urn_id} == {entry["origin_token"]}
+
+    # A later run does not send them again
+    api.sent.clear()
+    messageAgent.message_people("job.md", "ranked.csv", 2, outbox=outbox)
+    assert api.sent == []
+    assert outbox.get("urn0", jd_hash)["state"] != QUEUED
@@ -0,0 +1,58 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from Outbox import DRAFTED, FAILED, QUEUED, SENT, Outbox
+
+
+@pytest.fixture
+def outbox(tmp_path):
+    return Outbox(path=str(tmp_path / "outbox.sqlite"), max_attempts=3, backoff=30)
+
+
+def test_message_states(outbox):
+    entry = outbox.draft("urn1", "jd", "Alex", "Hello")
+    assert entry["state"] == DRAFTED
+    assert entry["attempts"] == 0
+
+    outbox.mark_queued("urn1", "jd")
+    assert outbox.get("urn1", "jd")["state"] == QUEUED
+
+    outbox.mark_sent("urn1", "jd")
+    entry = outbox.get("urn1", "jd")
+    assert entry["state"] == SENT
+    assert not outbox.is_sendable(entry)
+
+
+def test_draft_keeps_the_origin_token(outbox, tmp_path):
+    token = outbox.draft("urn1", "jd", "Alex", "Hello")["origin_token"]
+    outbox.mark_queued("urn1", "jd")
+
+    # Drafting again, e.g. after a crash, keeps the first message and its token
+    entry = Outbox(path=str(tmp_path / "outbox.sqlite")).draft("urn1", "jd", "Alex", "Hello again")
+    assert entry["origin_token"] == token
+    assert entry["message"] == "Hello"
+    assert entry["state"] == QUEUED
+
+    # Another job is another message
+    assert outbox.draft("urn1", "other jd", "Alex", "Hello")["origin_token"] != token
+
+
+def test_failed_sends_back_off_until_max_attempts(outbox, monkeypatch):
+    monkeypatch.setattr("Outbox.time.time", lambda: 1000.0)
+    outbox.draft("urn1", "jd", "Alex", "Hello")
+
+    for attempts, delay in [(1, 30), (2, 60)]:
+        outbox.mark_failed("urn1", "jd", "rate limited")
+        entry = outbox.get("urn1", "jd")
+        assert entry["state"] == FAILED
+        assert entry["attempts"] == attempts
+        assert entry["next_attempt_at"] == 1000.0 + delay
+        assert entry["last_error"] == "rate limited"
+        assert outbox.is_sendable(entry)
+
+    outbox.mark_failed("urn1", "jd", "rate limited")
+    assert not outbox.is_sendable(outbox.get("urn1", "jd"))
@@ -0,0 +1,74 @@
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+pytest.importorskip("sklearn")
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import Ranker
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+JOB_DESCRIPTION = os.path.join(FIXTURES, "job_description.md")
+CANDIDATES = os.path.join(FIXTURES, "candidates.csv")
+
+
+def test_prefilter_orders_survivors_by_score_then_the_rest_by_lexical_score(fake_model, tmp_path):
+    report = Ranker.ranker_sort(JOB_DESCRIPTION, CANDIDATES, tmp_path / "ranked.csv", prefilter_top_m=5)
+    ranked = pd.read_csv(tmp_path / "ranked.csv")
+
+    assert report == {"candidates": len(ranked), "survivors": 5}
+    survivors, filtered_out = ranked.iloc[:5], ranked.iloc[5:]
+    assert survivors["total_score"].is_monotonic_decreasing
+    assert filtered_out["lexical_score"].is_monotonic_decreasing
+    assert (filtered_out["total_score"] == 0).all()
+    # The survivors are the best candidates by lexical score
+    assert survivors["lexical_score"].min() >= filtered_out["lexical_score"].max()
+
+
+def test_prefilter_recall_against_the_full_ranking(fake_model, tmp_path):
+    Ranker.ranker_sort(JOB_DESCRIPTION, CANDIDATES, tmp_path / "full.csv")
+    full_top = set(pd.read_csv(tmp_path / "full.csv")["urn id"].head(3))
+
+    report = Ranker.ranker_sort(JOB_DESCRIPTION, CANDIDATES, tmp_path / "ranked.csv",
+                                prefilter_top_m=5, recall_at=3)
+    survivors = set(pd.read_csv(tmp_path / "ranked.csv")["urn id"].head(5))
+
+    assert report["recall_at"] == 3
+    assert report["recall"] == pytest.approx(len(full_top & survivors) / 3)
+
+
+def test_prefilter_keeping_everyone_matches_the_full_ranking(fake_model, tmp_path):
+    Ranker.ranker_sort(JOB_DESCRIPTION, CANDIDATES, tmp_path / "full.csv")
+    report = Ranker.ranker_sort(JOB_DESCRIPTION, CANDIDATES, tmp_path / "ranked.csv", prefilter_top_m=1000)
+
+    assert report is None
+    full = pd.read_csv(tmp_path / "full.csv")
+    ranked = pd.read_csv(tmp_path / "ranked.csv")
+    assert list(ranked["urn id"]) == list(full["urn id"])
+    assert np.allclose(ranked["total_score"], full["total_score"])
+
+
+@pytest.mark.parametrize("top_k", [None, 4])
+def test_sharded_ranking_matches_ranker_sort(tmp_path, monkeypatch, top_k):
+    # Workers are spawned processes loading the real model, which the fake_model fixture cannot replace
+    pytest.importorskip("sentence_transformers")
+    monkeypatch.chdir(tmp_path)
+    # Four shards merged two at a time, in two passes
+    monkeypatch.setattr(Ranker, "MERGE_FAN_IN", 2)
+
+    Ranker.ranker_sort(JOB_DESCRIPTION, CANDIDATES, tmp_path / "full.csv", use_cache=False)
+    Ranker.ranker_sort_sharded(JOB_DESCRIPTION, CANDIDATES, tmp_path / "sharded.csv",
+                               chunksize=3, max_workers=2, top_k=top_k)
+    full = pd.read_csv(tmp_path / "full.csv")
+    sharded = pd.read_csv(tmp_path / "sharded.csv")
+
+    assert len(sharded) == (top_k or len(full))
+    assert sharded["total_score"].is_monotonic_decreasing
+    assert np.allclose(sharded["total_score"], full["total_score"].head(len(sharded)), atol=1e-5)
+    full_scores = full.set_index("urn id")["total_score"]
+    assert np.allclose(sharded.set_index("urn id")["total_score"], full_scores[sharded["urn id"]], atol=1e-5)
+    assert not [name for name in os.listdir(tmp_path) if name.startswith("tmp")]
@@ -0,0 +1,44 @@
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+pytest.importorskip("sentence_transformers")
+pytest.importorskip("onnxruntime")
+pytest.importorskip("tokenizers")
+pytest.importorskip("huggingface_hub")
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import Ranker
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+
+def rank(backend, tmp_path):
+    Ranker.use_backend(backend)
+    output_csv = tmp_path / f"ranked_{backend}.csv"
+    Ranker.ranker_sort(
+        os.path.join(FIXTURES, "job_description.md"),
+        os.path.join(FIXTURES, "candidates.csv"),
+        output_csv,
+        use_cache=False,
+    )
+    return pd.read_csv(output_csv).set_index("urn id")["total_score"]
+
+
+def test_onnx_ranking_matches_torch(tmp_path):
+    backend = Ranker.ENCODER_BACKEND
+    try:
+        torch_scores = rank("torch", tmp_path)
+        onnx_scores = rank("onnx", tmp_path)[torch_scores.index]
+    finally:
+        Ranker.use_backend(backend)
+
+    # Quantization moves scores slightly but must not change the ranking materially
+    assert np.abs(torch_scores - onnx_scores).max() < 0.05
+    assert set(torch_scores.index[:3]) == set(onnx_scores.sort_values(ascending=False).index[:3])
+    spearman = np.corrcoef(torch_scores.rank(), onnx_scores.rank())[0, 1]
+    assert spearman > 0.95